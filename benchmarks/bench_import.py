@@ -0,0 +1,89 @@
+"""Benchmark of the import time of ffbot and of each CLI subcommand
+
+Times each case in fresh interpreters, lists the heavy dependencies it imports, and
+writes results as JSON, e.g.
+
+    python -m benchmarks.bench_import --repeat 10
+
+Run from the repository root.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from statistics import median
+from time import perf_counter
+
+from .bench_optimizer import _git
+
+# Code of each case, run with `python -c`
+CASES = {
+    "python": "pass",
+    "import ffbot": "import ffbot",
+    "ffbot.current_week": "import ffbot; ffbot.current_week",
+    "ffbot.load": "import ffbot; ffbot.load",
+    "ffbot --help": "import sys; from ffbot.cli import main; sys.argv[1:] = ['-h']; main()",
+    "ffbot scrape": "import ffbot.scraper, ffbot.utils",
+    "ffbot optimize": "import ffbot.optimizer, ffbot.utils",
+}
+HEAVY = ["highspy", "lxml", "numpy", "pandas", "pulp", "pyarrow", "requests", "tqdm"]
+
+
+def run_case(code):
+    """Run code in a fresh interpreter once
+
+    :return: (seconds, imported heavy modules)
+    """
+    startTime = perf_counter()
+    r = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    seconds = perf_counter() - startTime
+    modules = {
+        line.split("|")[-1].strip() for line in r.stderr.splitlines() if "|" in line
+    }
+    return seconds, sorted(set(HEAVY) & modules)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="bench_import.json")
+    args = parser.parse_args()
+
+    results = dict(
+        commit=_git("rev-parse", "HEAD"),
+        dirty=bool(_git("status", "--porcelain", "--untracked-files=no")),
+        date=datetime.now().isoformat(timespec="seconds"),
+        python=platform.python_version(),
+        cases=[],
+    )
+    for name, code in CASES.items():
+        runs = [run_case(code) for _ in range(args.repeat)]
+        seconds = [s for s, _ in runs]
+        case = dict(
+            name=name,
+            code=code,
+            median_seconds=median(seconds),
+            min_seconds=min(seconds),
+            imports=runs[0][1],
+        )
+        results["cases"].append(case)
+        print(
+            "{:>20}: {:6.0f} ms, imports {}".format(
+                name, case["median_seconds"] * 1e3, ", ".join(case["imports"]) or "-"
+            )
+        )
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print("Results written to {}".format(args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Benchmark of the optimizer on synthetic leagues of different sizes
+
+Times pre-processing, model build, each re-solve loop of the ranking, and output
+separately, and writes results as JSON to compare across commits, e.g.
+
+    python -m benchmarks.bench_optimizer --players 200 400 800 --output new.json
+    python -m benchmarks.bench_optimizer --output new.json --baseline old.json
+
+Run from the repository root.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+from collections import defaultdict
+from datetime import datetime
+from itertools import product
+from time import perf_counter
+
+import pulp
+
+from ffbot.optimizer import (
+    FORMULATIONS,
+    RANKINGS,
+    Players,
+    _league,
+    _session,
+    _to_frame,
+)
+
+from .synthetic import SLOTS, synthetic_players
+
+TEAM = 1
+# Re-solve loops of the ranking, in order, and the constraint relaxed to start each
+PHASES = ["initial solve", "free agent adds"]
+RELAXED_PHASES = ["free agent drops", "waiver adds", "waiver drops"]
+
+
+class TimedSession:
+    """Solver session wrapper that times solves by re-solve loop of the ranking"""
+
+    def __init__(self, session):
+        self.session = session
+        self.phase = PHASES[0]
+        self.seconds = defaultdict(float)
+        self.solves = defaultdict(int)
+        self._relaxed = 0
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    def add_limit(self, name, variables, limit):
+        self.session.add_limit(name, variables, limit)
+        self.phase = PHASES[1]
+
+    def relax(self, name):
+        self.session.relax(name)
+        self.phase = RELAXED_PHASES[self._relaxed]
+        self._relaxed += 1
+
+    def solve(self):
+        startTime = perf_counter()
+        self.session.solve()
+        self.seconds[self.phase] += perf_counter() - startTime
+        self.solves[self.phase] += 1
+
+
+def run_case(df, week, positions, solver, formulation, pruning, ranking="stepwise"):
+    """Optimize once, timing each stage"""
+    seconds = dict()
+    startTime = perf_counter()
+    players = Players.from_df(df, range(week, 18))
+    league = _league(players, TEAM, positions, pruning)
+    seconds["preprocess"] = perf_counter() - startTime
+
+    startTime = perf_counter()
+    model = FORMULATIONS[formulation](league)
+    session = TimedSession(_session(model.prob, solver))
+    seconds["build"] = perf_counter() - startTime
+
+    solutions = RANKINGS[ranking](league, model, session)
+    seconds.update(session.seconds)
+
+    startTime = perf_counter()
+    _to_frame(solutions)
+    seconds["output"] = perf_counter() - startTime
+    seconds["total"] = sum(seconds.values())
+    return dict(
+        players_in_model=len(model.players),
+        variables=model.prob.numVariables(),
+        constraints=model.prob.numConstraints(),
+        solves=dict(session.solves),
+        seconds=seconds,
+    )
+
+
+def _git(*args):
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _key(case):
+    return tuple(
+        case[k]
+        for k in ["players", "slots", "week", "multi_share", "solver", "formulation"]
+    ) + (case["pruning"],)
+
+
+def compare(results, baseline):
+    """Print the speedup of each case over the same case of a baseline"""
+    baseline_cases = {_key(case): case for case in baseline["cases"]}
+    print("Speedup over {}:".format(baseline["commit"]))
+    for case in results["cases"]:
+        old = baseline_cases.get(_key(case))
+        if old is None:
+            continue
+        print(
+            "{:>48}: {:6.2f}x ({:.2f} s -> {:.2f} s)".format(
+                ", ".join(str(x) for x in _key(case)),
+                old["seconds"]["total"] / case["seconds"]["total"],
+                old["seconds"]["total"],
+                case["seconds"]["total"],
+            )
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, nargs="+", default=[200, 400, 800])
+    parser.add_argument("--slots", nargs="+", default=list(SLOTS), choices=SLOTS)
+    parser.add_argument("--weeks", type=int, nargs="+", default=[4])
+    parser.add_argument("--multi-share", type=float, nargs="+", default=[0.02])
+    parser.add_argument("--solver", default="cbc", choices=["cbc", "highs"])
+    parser.add_argument("--formulation", default="reduced", choices=FORMULATIONS)
+    parser.add_argument("--pruning", action="store_true")
+    parser.add_argument("--ranking", default="stepwise", choices=RANKINGS)
+    parser.add_argument("--repeat", type=int, default=1, help="keep the fastest run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_optimizer.json")
+    parser.add_argument("--baseline", help="earlier results to compare with")
+    args = parser.parse_args()
+
+    results = dict(
+        commit=_git("rev-parse", "HEAD"),
+        dirty=bool(_git("status", "--porcelain", "--untracked-files=no")),
+        date=datetime.now().isoformat(timespec="seconds"),
+        python=platform.python_version(),
+        pulp=pulp.__version__,
+        cases=[],
+    )
+    for n_players, slots, week, multi_share in product(
+        args.players, args.slots, args.weeks, args.multi_share
+    ):
+        df = synthetic_players(n_players, slots, week, multi_share, args.seed)
+        runs = [
+            run_case(
+                df,
+                week,
+                SLOTS[slots],
+                args.solver,
+                args.formulation,
+                args.pruning,
+                args.ranking,
+            )
+            for _ in range(args.repeat)
+        ]
+        case = dict(
+            players=n_players,
+            slots=slots,
+            week=week,
+            multi_share=multi_share,
+            solver=args.solver,
+            formulation=args.formulation,
+            pruning=args.pruning,
+            ranking=args.ranking,
+            **min(runs, key=lambda run: run["seconds"]["total"]),
+        )
+        results["cases"].append(case)
+        print(
+            "{:>5} players, {:>9}, week {:>2}, {:.0%} multi-position: {:7.2f} s, "
+            "{} solves".format(
+                n_players,
+                slots,
+                week,
+                multi_share,
+                case["seconds"]["total"],
+                sum(case["solves"].values()),
+            )
+        )
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print("Results written to {}".format(args.output))
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Microbenchmark of parsing a playernote, compared to BeautifulSoup and read_html
+
+Run from the repository root with `python -m benchmarks.bench_parser`.
+"""
+
+import timeit
+from io import StringIO
+from os.path import join
+
+import pandas as pd
+
+from ffbot.scraper import parse_playernote
+
+PLAYERNOTE_FILE = join("tests", "playernote.html")
+NUMBER = 200
+
+
+def parse_playernote_bs4(html):
+    """Previous parsing, with BeautifulSoup CSS selectors and `pd.read_html`"""
+    from bs4 import BeautifulSoup as bs
+
+    soup = bs(html, "lxml")
+    playerinfo = soup.select_one(".playerinfo")
+    row = dict()
+    row["Name"] = playerinfo.select_one(".name").text
+    row["Position"] = playerinfo.select_one("dd.pos").text[:-1]
+    row["Owner"] = playerinfo.select_one("dd.owner").text[:-1]
+    a = playerinfo.select_one("dd.owner a")
+    row["Owner ID"] = int(a["href"].split("/")[-1]) if a else None
+    status = playerinfo.select_one(".status")
+    row["Status"] = status.text if status else None
+    row["% Owned"] = playerinfo.select_one("dd.owned").text.split()[0]
+    df2 = pd.read_html(StringIO(html))[0]
+    for _, row2 in df2.iterrows():
+        week = "Week {}".format(row2["Week"])
+        points = row2.get("Fan Pts")
+        if pd.isna(points) or points == "-":
+            row[week] = 0
+        elif points[0] == "*":
+            row[week] = float(points[1:])
+        else:
+            row[week] = float(points)
+    return row
+
+
+def main():
+    with open(PLAYERNOTE_FILE) as f:
+        html = f.read()
+    parsers = dict(lxml=parse_playernote)
+    try:
+        import bs4  # noqa: F401
+
+        parsers["bs4 + read_html"] = parse_playernote_bs4
+        assert parse_playernote_bs4(html) == parse_playernote(html)
+    except ImportError:
+        print("beautifulsoup4 is not installed, only timing the lxml parser")
+    for name, parser in parsers.items():
+        seconds = min(timeit.repeat(lambda: parser(html), number=NUMBER, repeat=5))
+        print("{:>16}: {:8.1f} µs per player".format(name, seconds / NUMBER * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Benchmark of the scraper against a local mock Yahoo server
+
+Reports requests per second, parse time, retries and total runtime of `scrape()`
+for each number of workers, and writes results as JSON, e.g.
+
+    python -m benchmarks.bench_scraper --players 500 --workers 1 4 8 16 --latency 0.05
+
+Run from the repository root.
+"""
+
+import argparse
+import json
+import platform
+import threading
+from datetime import datetime
+from time import perf_counter
+
+import ffbot
+from ffbot import scraper
+
+from .bench_optimizer import _git
+from .bench_parser import PLAYERNOTE_FILE
+from .mock_yahoo import MockYahoo
+
+LEAGUE = 1
+
+
+class ParseTimer:
+    """Total time spent in `parse_playernote()`, across scraper threads"""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def wrap(self, parse):
+        def timed(html):
+            startTime = perf_counter()
+            row = parse(html)
+            seconds = perf_counter() - startTime
+            with self._lock:
+                self.seconds += seconds
+                self.calls += 1
+            return row
+
+        return timed
+
+
+def run_case(yahoo, max_workers, rate):
+    """Scrape the mock server once"""
+    timer = ParseTimer()
+    base_url, parse = scraper.BASE_URL, scraper.parse_playernote
+    scraper.BASE_URL = yahoo.url
+    scraper.parse_playernote = timer.wrap(parse)
+    try:
+        startTime = perf_counter()
+        df = ffbot.scrape(LEAGUE, max_workers=max_workers, rate=rate)
+        seconds = perf_counter() - startTime
+    finally:
+        scraper.BASE_URL, scraper.parse_playernote = base_url, parse
+    requests = sum(yahoo.requests.values())
+    return dict(
+        players=len(df),
+        requests=dict(yahoo.requests),
+        retries=yahoo.errors,
+        requests_per_second=requests / seconds,
+        parse_seconds=timer.seconds,
+        parse_us_per_player=timer.seconds / max(timer.calls, 1) * 1e6,
+        seconds=seconds,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=300)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--rate", type=float, help="requests per second limit")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--recorded", action="store_true", help="serve the recorded test playernote"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_scraper.json")
+    args = parser.parse_args()
+
+    results = dict(
+        commit=_git("rev-parse", "HEAD"),
+        dirty=bool(_git("status", "--porcelain", "--untracked-files=no")),
+        date=datetime.now().isoformat(timespec="seconds"),
+        python=platform.python_version(),
+        cases=[],
+    )
+    for max_workers in args.workers:
+        with MockYahoo(
+            n_players=args.players,
+            latency=args.latency,
+            error_rate=args.error_rate,
+            playernote=PLAYERNOTE_FILE if args.recorded else None,
+            seed=args.seed,
+        ) as yahoo:
+            case = dict(
+                max_workers=max_workers,
+                rate=args.rate,
+                latency=args.latency,
+                error_rate=args.error_rate,
+                recorded=args.recorded,
+                **run_case(yahoo, max_workers, args.rate),
+            )
+        results["cases"].append(case)
+        print(
+            "{:>3} workers: {:7.2f} s, {:7.1f} requests/s, {:4} retries, "
+            "{:6.0f} µs parsing per player".format(
+                max_workers,
+                case["seconds"],
+                case["requests_per_second"],
+                case["retries"],
+                case["parse_us_per_player"],
+            )
+        )
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print("Results written to {}".format(args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""Local stand-in for the Yahoo pages that `ffbot.scrape()` requests
+
+Serves player list pages, playernotes, league settings and the week page of synthetic
+(or recorded) players, with configurable latency and error responses, e.g.
+
+    with MockYahoo(n_players=500, latency=0.05, error_rate=0.01) as yahoo:
+        ffbot.scraper.BASE_URL = yahoo.url
+        df = ffbot.scrape(1)
+"""
+
+import json
+import random
+import threading
+from collections import Counter
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import sleep
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from .synthetic import synthetic_players
+
+# Status codes that the scraper retries
+ERROR_CODES = [500, 502, 503, 504, 999]
+PAGE_SIZE = 25
+# Player positions listed by each position group search
+GROUPS = dict(
+    QB={"QB"},
+    WR={"WR"},
+    RB={"RB"},
+    TE={"TE"},
+    K={"K"},
+    DEF={"DEF"},
+    D={"CB", "DE", "DT", "LB", "S"},
+    DB={"CB", "S"},
+    DL={"DE", "DT"},
+    LB={"LB"},
+)
+# Roster positions of public leagues, by kind
+ROSTER_POSITIONS = dict(
+    DEF="QB, WR, WR, WR, RB, RB, TE, W/R/T, K, DEF, BN, BN, BN, BN, IR",
+    IDP="QB, WR, WR, RB, RB, TE, W/R/T, K, D, DB, DL, LB, BN, BN, BN, IR",
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections alive, like Yahoo
+
+    def do_GET(self):
+        self.server.mock.handle(self)
+
+    def log_message(self, *args):
+        pass
+
+
+class MockYahoo:
+    """Threaded HTTP server of Yahoo pages, run in the background as a context manager
+
+    :param df: players to serve, in the schema returned by `ffbot.load()`, defaults to
+        synthetic players
+    :param n_players: (int) number of synthetic players
+    :param week: current week
+    :param latency: (float) seconds before each response
+    :param error_rate: (float) share of requests that get an error response
+    :param error_codes: (list) status codes of error responses
+    :param playernote: filepath of a recorded playernote to serve for every player,
+        instead of synthetic playernotes
+    :param public_leagues: (dict) kind of each public league ID, "DEF" or "IDP", whose
+        settings and player lists are served
+    :param seed: seed of the random number generator
+    """
+
+    def __init__(
+        self,
+        df=None,
+        n_players=300,
+        week=4,
+        latency=0.0,
+        error_rate=0.0,
+        error_codes=ERROR_CODES,
+        playernote=None,
+        public_leagues=None,
+        seed=0,
+    ):
+        self.df = (
+            synthetic_players(n_players, week=week, seed=seed) if df is None else df
+        )
+        self.week = week
+        self.public_leagues = (
+            {101: "DEF", 283: "IDP"} if public_leagues is None else public_leagues
+        )
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_codes = error_codes
+        self.requests = Counter()  # by endpoint, e.g. "players"
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self.url = None
+
+        # Render pages once
+        positions = self.df["Position"].astype(str).str.split(",")
+        self._groups = {
+            group: [
+                (ID, team)
+                for ID, team, player_positions in zip(
+                    self.df["ID"], self.df["Team"], positions
+                )
+                if group_positions & {n.strip() for n in player_positions}
+            ]
+            for group, group_positions in GROUPS.items()
+        }
+        if playernote:
+            with open(playernote) as f:
+                content = json.dumps(dict(content=f.read())).encode()
+            self._notes = {ID: content for ID in self.df["ID"]}
+        else:
+            self._notes = {
+                row["ID"]: json.dumps(dict(content=self._playernote(row))).encode()
+                for row in self.df.to_dict("records")
+            }
+
+    def _playernote(self, row):
+        """Playernote of a player, with the elements that `parse_playernote()` reads"""
+        owner = escape(str(row["Owner"]))
+        if not pd.isna(row["Owner ID"]):
+            owner = '<a href="/f1/1/{}">{}</a>'.format(int(row["Owner ID"]), owner)
+        status = ""
+        if not pd.isna(row["Status"]):
+            status = '<span class="status">{}</span>'.format(row["Status"])
+        weeks = []
+        for t in range(1, 19):
+            points = row.get("Week {}".format(t), 0)
+            if points == 0:
+                points = "-"
+            elif t >= self.week:
+                points = "*{:.2f}".format(points)
+            else:
+                points = "{:.2f}".format(points)
+            weeks.append("<tr><td>{}</td><td>{}</td></tr>".format(t, points))
+        return (
+            '<div class="playerinfo"><span class="name">{}</span>{}<dl>'
+            '<dd class="pos">{},</dd><dd class="owner">{},</dd>'
+            '<dd class="owned">{} owned</dd></dl></div>'
+            "<table><thead><tr><th>Week</th><th>Fan Pts</th></tr></thead>"
+            "<tbody>{}</tbody></table>"
+        ).format(
+            escape(row["Name"]),
+            status,
+            row["Position"],
+            owner,
+            row["% Owned"],
+            "".join(weeks),
+        )
+
+    def _players_page(self, league, group, count):
+        """Player list page of a position group, or all players, starting at a rank
+
+        Leagues that aren't public list no players.
+        """
+        if league not in self.public_leagues:
+            players = []
+        elif group is None:
+            players = list(zip(self.df["ID"], self.df["Team"]))
+        else:
+            players = self._groups.get(group, [])
+        rows = "".join(
+            '<tr><td><span class="player-status"><a data-ys-playerid="{}">i</a></span>'
+            '</td><td><div class="ysf-player-name"><span class="D-b"><span>{} - {}'
+            "</span></span></div></td></tr>".format(ID, team, group)
+            for ID, team in players[count:][:PAGE_SIZE]
+        )
+        return (
+            '<html><div id="players-table"><table><thead><tr><th>Player</th></tr>'
+            "</thead><tbody>{}</tbody></table></div></html>"
+        ).format(rows)
+
+    def _settings_page(self, league):
+        """League settings page of a public league, or a page without settings"""
+        if league not in self.public_leagues:
+            return "<html><body>This league is private</body></html>"
+        return (
+            "<html><table><thead><tr><th>Setting</th><th>Value</th></tr></thead>"
+            "<tbody><tr><td>League Name:</td><td>Public league {}</td></tr>"
+            "<tr><td>Roster&nbsp;Positions:</td><td>{}</td></tr></tbody></table></html>"
+        ).format(league, ROSTER_POSITIONS[self.public_leagues[league]])
+
+    def handle(self, handler):
+        """Respond to a request"""
+        url = urlparse(handler.path)
+        params = parse_qs(url.query)
+        path = url.path.rstrip("/").split("/")
+        endpoint = path[-1]
+        league = int(path[-2]) if path[-2].isdigit() else None
+        if self.latency:
+            sleep(self.latency)
+        with self._lock:
+            self.requests[endpoint] += 1
+            error = self._rng.random() < self.error_rate
+            if error:
+                self.errors += 1
+                status = self._rng.choice(self.error_codes)
+
+        content_type = "text/html"
+        if error:
+            body = b"Error"
+        elif endpoint == "players":
+            status = 200
+            page = self._players_page(
+                league, params.get("pos", [None])[0], int(params["count"][0])
+            )
+            body = page.encode()
+        elif endpoint == "settings":
+            status = 200
+            body = self._settings_page(league).encode()
+        elif endpoint == "playernote" and int(params["pid"][0]) in self._notes:
+            status = 200
+            content_type = "application/json"
+            body = self._notes[int(params["pid"][0])]
+        elif endpoint.isdigit():
+            status = 200
+            body = "<html><body>Week {} matchups</body></html>".format(self.week)
+            body = body.encode()
+        else:
+            status = 404
+            body = b"Not found"
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.mock = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.url = "http://127.0.0.1:{}/f1".format(self._server.server_port)
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
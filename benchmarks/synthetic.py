@@ -0,0 +1,116 @@
+"""Synthetic scraped data of a league, in the schema returned by `ffbot.load()`"""
+
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+import ffbot
+from ffbot.optimizer import _possible_positions
+from ffbot.utils import REPLACEMENT_DEPTH
+
+N_TEAMS = 12
+WEEKS = range(1, 19)
+SLOTS = dict(
+    standard="QB, WR, WR, WR, RB, RB, TE, W/R/T, K, DEF, BN, BN, BN, BN, IR",
+    superflex="QB, WR, WR, WR, RB, RB, TE, W/R/T, Q/W/R/T, K, DEF, BN, BN, BN, BN, BN, IR",
+    idp="QB, WR, WR, RB, RB, TE, W/R/T, K, DEF, D, D, DB, DL, LB, BN, BN, BN, BN, BN, IR",
+)
+# Share of players, and mean weekly points of a typical starter, per position
+POSITION_MIX = dict(
+    QB=(0.15, 16), WR=(0.25, 10), RB=(0.2, 9), TE=(0.15, 6), K=(0.1, 7), DEF=(0.05, 7)
+)
+POSITION_MIX_IDP = dict(
+    CB=(0.1, 6), DE=(0.08, 7), DT=(0.06, 5), LB=(0.1, 8), S=(0.06, 6)
+)
+MULTI_POSITIONS = ["WR, TE", "WR, RB", "RB, TE"]
+MULTI_POSITIONS_IDP = ["DE, LB", "CB, S", "DE, DT"]
+STATUSES = ["Q", "D", "O", "IR", "IR-R", "PUP-R", "COVID-19"]
+TEAMS = ["Ari", "Atl", "Bal", "Buf", "Car", "Chi", "Cin", "Cle", "Dal", "Den", "Det"]
+TEAMS += ["GB", "Hou", "Ind", "Jax", "KC", "LAC", "LAR", "LV", "Mia", "Min", "NE"]
+TEAMS += ["NO", "NYG", "NYJ", "Phi", "Pit", "SF", "Sea", "TB", "Ten", "Was"]
+
+
+def _draft(positions, points, slots):
+    """Owner of each player, each team drafting the best player for each roster slot
+
+    Enough players of each position stay available to set its replacement level.
+    """
+    slots = [x.strip() for x in slots.split(",")]
+    possible = _possible_positions(slots, set(positions))
+    owners = np.full(len(positions), np.nan)
+    order = np.argsort(-points, kind="stable")
+    available = Counter(positions)
+    for slot in slots:
+        if slot == "IR":
+            continue
+        for team in range(1, N_TEAMS + 1):
+            for i in order:
+                if (
+                    np.isnan(owners[i])
+                    and available[positions[i]] > REPLACEMENT_DEPTH
+                    and (slot == "BN" or slot in possible[positions[i]])
+                ):
+                    owners[i] = team
+                    available[positions[i]] -= 1
+                    break
+    return owners
+
+
+def synthetic_players(
+    n_players=400, slots="standard", week=4, multi_share=0.02, seed=0
+):
+    """Scraped data of a synthetic league, with VOR calculated for a week
+
+    :param n_players: (int) number of players
+    :param slots: roster slots of the league, "standard", "superflex" or "idp"
+    :param week: current week
+    :param multi_share: (float) share of players with multiple positions
+    :param seed: seed of the random number generator
+    """
+    rng = np.random.default_rng(seed)
+    mix = dict(POSITION_MIX)
+    multi_positions = list(MULTI_POSITIONS)
+    if slots == "idp":
+        mix.update(POSITION_MIX_IDP)
+        multi_positions += MULTI_POSITIONS_IDP
+    shares = np.array([share for share, _ in mix.values()])
+    positions = rng.choice(list(mix), n_players, p=shares / shares.sum()).astype(object)
+    is_multi = rng.random(n_players) < multi_share
+    positions[is_multi] = rng.choice(multi_positions, is_multi.sum())
+
+    # Weekly points of skilled and unskilled players, with a bye week
+    means = np.array(
+        [mix[position.split(",")[0]][1] for position in positions]
+    ) * rng.lognormal(0, 0.5, n_players)
+    points = means[:, None] * rng.gamma(8, 1 / 8, (n_players, len(WEEKS)))
+    points[np.arange(n_players), rng.integers(4, 14, n_players)] = 0
+    points = points.round(2)
+
+    remaining = (points * (np.array(WEEKS) >= week)).sum(axis=1)
+    owner_ids = _draft(positions, remaining, SLOTS[slots])
+    available = np.isnan(owner_ids)
+    owners = np.array(
+        ["Free Agent" if a else str(int(o)) for a, o in zip(available, owner_ids)],
+        dtype=object,
+    )
+    owners[available & (rng.random(n_players) < 0.05)] = "Waivers (Jan 2)"
+    statuses = np.where(
+        rng.random(n_players) < 0.1, rng.choice(STATUSES, n_players), None
+    )
+
+    df = pd.DataFrame(
+        {
+            "ID": np.arange(1, n_players + 1),
+            "Name": ["Player {}".format(i) for i in range(1, n_players + 1)],
+            "Team": rng.choice(TEAMS, n_players),
+            "Position": positions,
+            "Owner": owners,
+            "Owner ID": owner_ids,
+            "Status": statuses,
+            "% Owned": ["{}%".format(x) for x in rng.integers(0, 101, n_players)],
+        }
+    )
+    weeks = pd.DataFrame(points, columns=["Week {}".format(t) for t in WEEKS])
+    df = pd.concat([df, weeks], axis=1)
+    return ffbot.vor(df, week).round(2)
@@ -12,7 +12,7 @@ df = ffbot.scrape(LEAGUE)
 # If playing an Individual Defensive Player (IDP) league, then scrape additional players with:
 # df = ffbot.scrape(LEAGUE, is_IDP=True)
 
-# Optional save data to CSV, and load latest data
+# Optional save data to a Parquet snapshot, and load latest data
 # ffbot.save(df, week)
 # df, week = ffbot.load()
 
@@ -1,6 +1,47 @@
+from typing import TYPE_CHECKING
+
 from .constants import VERSION
-from .optimizer import optimize  # noqa: F401,E402
-from .scraper import current_week, scrape  # noqa: F401,E402
-from .utils import load, save  # noqa: F401,E402
 
 __version__ = VERSION
+
+# Public names by module, imported on first use, so that e.g. `ffbot.current_week()`
+# doesn't pay for importing pandas and PuLP
+_LAZY = {
+    "batch": ["optimize_batch"],
+    "cache": ["ResponseCache"],
+    "discovery": ["find_public_leagues"],
+    "instrumentation": ["trace"],
+    "optimizer": ["optimize", "prune"],
+    "scenarios": ["simulate", "sweep"],
+    "scraper": ["current_week", "league_context", "scrape"],
+    "service": ["Service", "serve"],
+    "utils": ["compact", "load", "save", "vor"],
+}
+_MODULES = {name: module for module, names in _LAZY.items() for name in names}
+
+__all__ = ["VERSION", *_MODULES]
+
+if TYPE_CHECKING:
+    from .batch import optimize_batch  # noqa: F401
+    from .cache import ResponseCache  # noqa: F401
+    from .discovery import find_public_leagues  # noqa: F401
+    from .instrumentation import trace  # noqa: F401
+    from .optimizer import optimize, prune  # noqa: F401
+    from .scenarios import simulate, sweep  # noqa: F401
+    from .scraper import current_week, league_context, scrape  # noqa: F401
+    from .service import Service, serve  # noqa: F401
+    from .utils import compact, load, save, vor  # noqa: F401
+
+
+def __getattr__(name):
+    if name not in _MODULES:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    from importlib import import_module
+
+    value = getattr(import_module("." + _MODULES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_MODULES))
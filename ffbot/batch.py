@@ -0,0 +1,87 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from time import perf_counter
+
+import pandas as pd
+from loguru import logger
+
+from .optimizer import Players, solve
+
+# Player data shared by all jobs in a worker process, keyed by league
+_leagues = dict()
+
+
+@dataclass
+class Result:
+    """Result of one optimization job"""
+
+    df_opt: pd.DataFrame  # None if the job failed
+    seconds: float
+    error: str = None
+
+
+def _init_worker(leagues):
+    _leagues.update(leagues)
+
+
+def _run(league, team, positions, options):
+    """Run one job in a worker process, catching failures"""
+    startTime = perf_counter()
+    try:
+        df_opt = solve(_leagues[league], team, positions, **options)
+        return Result(df_opt, perf_counter() - startTime)
+    except Exception as e:
+        return Result(None, perf_counter() - startTime, "{!r}".format(e))
+
+
+def optimize_batch(jobs, max_workers=None, **options):
+    """Optimize many teams and leagues in parallel, one solver run per worker
+
+    Jobs that share the same scraped DataFrame and week share its pre-processing,
+    which is done once per end week and sent to each worker process once. A failing
+    job, e.g. an infeasible league, is reported in its result instead of aborting the
+    batch.
+
+    :param jobs: dict of job name to (df, week, team, positions)
+    :param max_workers: (int) number of worker processes, defaults to CPU count
+    :param options: other arguments for `optimize()`, e.g. end_week=10 or
+        solver="highs"
+    :return: dict of job name to Result(df_opt, seconds, error)
+    """
+
+    # Pre-process each league once
+    end_week = options.pop("end_week", 17)
+    leagues = dict()
+    results = dict()
+    tasks = dict()
+    for name, (df, week, team, positions) in jobs.items():
+        league = (id(df), week, end_week)
+        if league not in leagues:
+            startTime = perf_counter()
+            try:
+                leagues[league] = Players.from_df(df, range(week, end_week + 1))
+            except Exception as e:
+                leagues[league] = Result(
+                    None, perf_counter() - startTime, "{!r}".format(e)
+                )
+        if isinstance(leagues[league], Result):
+            results[name] = leagues[league]
+        else:
+            tasks[name] = (league, team, positions, options)
+    leagues = {k: v for k, v in leagues.items() if isinstance(v, Players)}
+
+    # Solve jobs in parallel
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_init_worker, initargs=(leagues,)
+    ) as executor:
+        futures = {name: executor.submit(_run, *task) for name, task in tasks.items()}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:  # e.g. worker process died
+                results[name] = Result(None, 0.0, "{!r}".format(e))
+
+    for name, result in results.items():
+        if result.error:
+            logger.warning("Job {} failed: {}".format(name, result.error))
+    return {name: results[name] for name in jobs}
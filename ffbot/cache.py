@@ -0,0 +1,159 @@
+import hashlib
+import json
+import threading
+from datetime import timedelta
+from os import listdir, makedirs, remove, replace, utime
+from os.path import exists, getmtime, getsize, join
+from time import time
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+import requests
+from loguru import logger
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+CACHE_FOLDER = join("data", "cache")
+CACHE_MAX_SIZE = 500 * 2**20  # bytes
+# Time-to-live of cached pages by the last part of their path, e.g. /f1/101/players
+CACHE_TTLS = {
+    "playernote": timedelta(days=1),
+    "players": timedelta(hours=1),
+}
+CACHE_DEFAULT_TTL = timedelta(minutes=10)
+
+
+class ResponseCache:
+    """On-disk cache of HTTP GET responses, keyed by URL and params
+
+    Fresh responses are served from disk. Stale responses are revalidated with
+    If-None-Match/If-Modified-Since, so an unchanged page costs a 304 response
+    instead of a download. The least recently used responses are evicted once the
+    cache is larger than max_size. In offline mode every response is served from the
+    cache regardless of age, and missing pages raise a ConnectionError.
+    """
+
+    def __init__(
+        self,
+        folder=CACHE_FOLDER,
+        ttls=None,
+        default_ttl=CACHE_DEFAULT_TTL,
+        max_size=CACHE_MAX_SIZE,
+        offline=False,
+    ):
+        self.folder = folder
+        self.ttls = CACHE_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self.max_size = max_size
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+        if not exists(folder):
+            makedirs(folder)
+        self._size = sum(getsize(join(folder, f)) for f in listdir(folder))
+
+    @staticmethod
+    def key(url):
+        """Cache key of a URL, independent of the order of its params"""
+        u = urlparse(url)
+        query = urlencode(sorted(parse_qsl(u.query, keep_blank_values=True)))
+        return hashlib.sha1(u._replace(query=query).geturl().encode()).hexdigest()
+
+    def ttl(self, url):
+        """Time-to-live of a URL"""
+        endpoint = urlparse(url).path.rstrip("/").split("/")[-1]
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, url):
+        """Cached (metadata, content) of a URL, or None"""
+        path = join(self.folder, self.key(url))
+        try:
+            with open(path + ".json") as f:
+                meta = json.load(f)
+            with open(path + ".body", "rb") as f:
+                content = f.read()
+            utime(path + ".json")  # mark as recently used
+        except (OSError, ValueError):
+            # Missing, or evicted by another thread meanwhile
+            return None
+        return meta, content
+
+    def count(self, name):
+        """Increment the "hits", "misses" or "revalidated" counter, from any thread"""
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def is_fresh(self, url, meta):
+        """Can a cached response be served without revalidating it?"""
+        return self.offline or time() - meta["time"] < self.ttl(url).total_seconds()
+
+    def put(self, url, response):
+        """Cache a response"""
+        headers = {
+            k: v
+            for k, v in response.headers.items()
+            if k.lower()
+            not in ("content-encoding", "content-length", "transfer-encoding")
+        }
+        meta = dict(url=url, status=response.status_code, headers=headers, time=time())
+        content = response.content
+        path = join(self.folder, self.key(url))
+        tmp = "{}.{}.tmp".format(path, threading.get_ident())
+        with open(tmp + ".body", "wb") as f:
+            f.write(content)
+        with open(tmp + ".json", "w") as f:
+            json.dump(meta, f)
+        with self._lock:
+            # Size of the entry that is overwritten, if any
+            try:
+                old = getsize(path + ".body") + getsize(path + ".json")
+            except OSError:
+                old = 0
+            replace(tmp + ".body", path + ".body")
+            replace(tmp + ".json", path + ".json")
+            self._size += len(content) + getsize(path + ".json") - old
+            if self._size > self.max_size:
+                self.evict()
+
+    def touch(self, url, meta):
+        """Mark a cached response as fresh again, after it was revalidated"""
+        meta["time"] = time()
+        path = join(self.folder, self.key(url))
+        with open(path + ".json", "w") as f:
+            json.dump(meta, f)
+
+    def evict(self):
+        """Remove least recently used responses until the cache fits in max_size"""
+        entries = []
+        for f in listdir(self.folder):
+            if f.endswith(".json"):
+                path = join(self.folder, f[:-5])
+                try:
+                    entries.append((getmtime(path + ".json"), path))
+                except OSError:
+                    continue
+        self._size = sum(getsize(join(self.folder, f)) for f in listdir(self.folder))
+        for _, path in sorted(entries):
+            if self._size <= self.max_size * 0.9:
+                break
+            for ext in (".json", ".body"):
+                try:
+                    self._size -= getsize(path + ext)
+                    remove(path + ext)
+                except OSError:
+                    pass
+        logger.info("Evicted cached responses to {} bytes".format(self._size))
+
+    def response(self, request, meta, content):
+        """Build a response from cached data"""
+        r = requests.Response()
+        r.status_code = meta["status"]
+        r.headers = CaseInsensitiveDict(meta["headers"])
+        r.encoding = get_encoding_from_headers(r.headers)
+        r._content = content
+        r.url = request.url
+        r.request = request
+        r.reason = "OK"
+        r.from_cache = True
+        return r
@@ -0,0 +1,154 @@
+"""Command line interface, e.g.
+
+    ffbot scrape 123456
+    ffbot optimize 1 --league 123456
+    ffbot load --league 123456
+    ffbot serve 123456 --port 8080
+    ffbot discover
+
+Each subcommand only imports the modules it uses, to start fast from cron and other
+short-lived jobs.
+"""
+
+import argparse
+from os.path import join
+
+from .constants import VERSION
+
+POSITIONS = "QB, WR, WR, WR, RB, RB, TE, W/R/T, K, DEF, BN, BN, BN, BN, IR"
+
+
+def _scrape(args):
+    """Scrape a league, and save a snapshot of its data"""
+    from .scraper import league_context, scrape
+    from .utils import save
+
+    options = dict(max_workers=args.workers, rate=args.rate)
+    options = {k: v for k, v in options.items() if v is not None}
+    context = league_context(args.idp, folder=args.context)
+    df = scrape(
+        args.league,
+        is_IDP=args.idp,
+        context=context,
+        checkpoint=args.checkpoint,
+        **options,
+    )
+    filepath = save(df, context.week, args.league)
+    print("Saved {} players of week {} to {}".format(len(df), context.week, filepath))
+
+
+def _optimize(args):
+    """Optimize player pick-ups of a team from a saved snapshot"""
+    from .optimizer import optimize
+    from .utils import load
+
+    df, week = load(args.file, args.league)
+    df_opt = optimize(
+        df,
+        week,
+        args.team,
+        args.positions,
+        solver=args.solver,
+        pruning=args.pruning,
+        ranking=args.ranking,
+    )
+    print(df_opt.to_string())
+
+
+def _load(args):
+    """Summarize a saved snapshot"""
+    from .utils import load
+
+    df, week = load(args.file, args.league)
+    print("Week {}, {} players".format(week, len(df)))
+    print(df.head(args.rows).to_string())
+
+
+def _serve(args):
+    """Serve optimize requests over a local HTTP/JSON API, refreshing leagues"""
+    from datetime import timedelta
+
+    from .service import serve
+
+    refresh = timedelta(hours=args.refresh) if args.refresh else None
+    serve(args.leagues, args.host, args.port, is_IDP=args.idp, refresh=refresh)
+
+
+def _discover(args):
+    """Find public DEF and IDP leagues, to read player lists and the current week"""
+    from .discovery import find_public_leagues
+
+    found = find_public_leagues(
+        range(args.start, args.stop),
+        args.kinds,
+        max_workers=args.workers,
+        rate=args.rate or None,
+        filepath=args.file,
+    )
+    for kind in args.kinds:
+        print("{}: {}".format(kind, found.get(kind, "not found")))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="ffbot", description="Automate playing Yahoo Fantasy Football"
+    )
+    parser.add_argument("--version", action="version", version=VERSION)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    scrape = subparsers.add_parser("scrape", help=_scrape.__doc__)
+    scrape.add_argument("league", type=int, help="league ID")
+    scrape.add_argument("--idp", action="store_true", help="IDP league")
+    scrape.add_argument("--workers", type=int, help="concurrent requests")
+    scrape.add_argument("--rate", type=float, help="requests per second limit")
+    scrape.add_argument("--checkpoint", help="checkpoint file to resume from")
+    scrape.add_argument("--context", help="folder to share the player list and week in")
+    scrape.set_defaults(func=_scrape)
+
+    optimize = subparsers.add_parser("optimize", help=_optimize.__doc__)
+    optimize.add_argument("team", type=int, help="team ID")
+    optimize.add_argument("--positions", default=POSITIONS, help="roster slots")
+    optimize.add_argument("--league", type=int, help="league ID of the snapshot")
+    optimize.add_argument("--file", help="snapshot, defaults to the latest")
+    optimize.add_argument("--solver", default="cbc", choices=["cbc", "highs"])
+    optimize.add_argument("--pruning", action="store_true")
+    optimize.add_argument(
+        "--ranking", default="stepwise", choices=["stepwise", "bounded"]
+    )
+    optimize.set_defaults(func=_optimize)
+
+    load = subparsers.add_parser("load", help=_load.__doc__)
+    load.add_argument("--league", type=int, help="league ID of the snapshot")
+    load.add_argument("--file", help="snapshot, defaults to the latest")
+    load.add_argument("--rows", type=int, default=10, help="players to show")
+    load.set_defaults(func=_load)
+
+    serve = subparsers.add_parser("serve", help=_serve.__doc__)
+    serve.add_argument("leagues", type=int, nargs="+", help="league IDs")
+    serve.add_argument("--idp", action="store_true", help="IDP leagues")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8080)
+    serve.add_argument(
+        "--refresh", type=float, default=6, help="hours between scrapes, 0 for never"
+    )
+    serve.set_defaults(func=_serve)
+
+    discover = subparsers.add_parser("discover", help=_discover.__doc__)
+    discover.add_argument("--start", type=int, default=0, help="first league ID")
+    discover.add_argument("--stop", type=int, default=1000, help="last league ID + 1")
+    discover.add_argument(
+        "--kinds", nargs="+", default=["DEF", "IDP"], choices=["DEF", "IDP"]
+    )
+    discover.add_argument("--workers", type=int, default=4, help="concurrent probes")
+    discover.add_argument(
+        "--rate", type=float, default=2, help="requests per second limit, 0 for none"
+    )
+    discover.add_argument(
+        "--file",
+        default=join("data", "public-leagues.json"),
+        help="file of probe results, skipping leagues that weren't public",
+    )
+    discover.set_defaults(func=_discover)
+
+    args = parser.parse_args(argv)
+    args.func(args)
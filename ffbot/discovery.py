@@ -0,0 +1,214 @@
+"""Discovery of public Yahoo leagues, to read the player universe and current week
+
+The scraper reads player lists from `PUBLIC_LEAGUE` and `PUBLIC_LEAGUE_IDP`. When
+either goes stale, `fail_over()` switches it to a validated alternate, found by
+`find_public_leagues()`.
+"""
+
+import json
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from itertools import islice
+from os import makedirs, replace
+from os.path import dirname, join
+from time import time
+
+import requests
+from loguru import logger
+from lxml import etree
+from user_agent import generate_user_agent
+
+from . import scraper
+from .instrumentation import count, span
+from .scraper import _PLAYER_ROWS, RateLimiter, _parse_html, _thread_session
+
+# Candidate league IDs, and limits on probing them
+LEAGUE_IDS = range(1000)
+DISCOVERY_WORKERS = 4
+DISCOVERY_RATE = 2  # requests per second, shared by all workers
+# Leagues found not to be public are skipped for this long
+NEGATIVE_TTL = timedelta(days=30)
+PROBES_FILE = join("data", "public-leagues.json")
+
+KINDS = ["DEF", "IDP"]
+IDP_POSITIONS = {"D", "DB", "DL", "LB", "CB", "S", "DE", "DT"}
+
+_SETTINGS_ROWS = etree.XPath("//table//tr")
+_CELLS = etree.XPath("th|td")
+
+
+def _roster_positions(html):
+    """Roster positions of a league settings page, or an empty set"""
+    for row in _SETTINGS_ROWS(html):
+        cells = [" ".join(cell.text_content().split()) for cell in _CELLS(row)]
+        if len(cells) > 1 and cells[0] == "Roster Positions:":
+            return {position.strip() for position in cells[1].split(",")}
+    return set()
+
+
+def probe(s, league):
+    """Kinds of public league that a league is, validated by its player list
+
+    :param s: requests session
+    :param league: league ID
+    :return: (set) "DEF" and/or "IDP", empty if the league isn't a usable public league
+    """
+    s.headers["User-Agent"] = generate_user_agent()
+    r = s.get("{}/{}/settings".format(scraper.BASE_URL, league))
+    with span("parse", page="settings"):
+        positions = _roster_positions(_parse_html(r.text))
+    kinds = set()
+    if "DEF" in positions:
+        kinds.add("DEF")
+    if positions & IDP_POSITIONS:
+        kinds.add("IDP")
+    if kinds:
+        # Confirm players list is accessible
+        s.headers["User-Agent"] = generate_user_agent()
+        r = s.get(
+            "{}/{}/players".format(scraper.BASE_URL, league),
+            params=dict(count=0, sort="PR_S", status="ALL"),
+        )
+        with span("parse", page="players"):
+            if not _PLAYER_ROWS(_parse_html(r.text)):
+                return set()
+    return kinds
+
+
+def _load_probes(filepath):
+    """Earlier probe results from the current URL: public leagues by kind, and times
+    that leagues were found not to be public"""
+    try:
+        with open(filepath) as f:
+            probes = json.load(f)
+    except (OSError, ValueError):
+        probes = dict()
+    if probes.get("base_url") != scraper.BASE_URL:
+        return dict(), dict()
+    invalid = {int(league): t for league, t in probes.get("invalid", {}).items()}
+    return probes.get("public", {}), invalid
+
+
+def _save_probes(filepath, public, invalid):
+    if dirname(filepath):
+        makedirs(dirname(filepath), exist_ok=True)
+    tmp = "{}.{}.tmp".format(filepath, threading.get_ident())
+    with open(tmp, "w") as f:
+        json.dump(
+            dict(
+                base_url=scraper.BASE_URL,
+                public=public,
+                invalid=dict(sorted(invalid.items())),
+            ),
+            f,
+        )
+    replace(tmp, filepath)
+
+
+@span("discover leagues")
+def find_public_leagues(
+    candidates=LEAGUE_IDS,
+    kinds=KINDS,
+    max_workers: int = DISCOVERY_WORKERS,
+    rate: float = DISCOVERY_RATE,
+    filepath: str = PROBES_FILE,
+    ttl: timedelta = NEGATIVE_TTL,
+):
+    """Find a public league of each kind, probing candidate league IDs concurrently
+
+    Public leagues found earlier are validated first. Other candidates are probed in
+    order, skipping leagues found not to be public less than `ttl` ago, until a league
+    of every kind is found. Results are remembered in `filepath`.
+
+    :param candidates: league IDs to probe
+    :param kinds: kinds of league to find, "DEF" and/or "IDP"
+    :param max_workers: (int) number of concurrent probes
+    :param rate: (float) maximum requests per second to Yahoo, or None for no limit
+    :param filepath: JSON file of probe results, or None to not remember them
+    :param ttl: (timedelta) time to skip leagues that weren't public
+    :return: (dict) league ID by kind, only of the kinds that were found
+    """
+    public, invalid = _load_probes(filepath) if filepath else (dict(), dict())
+    now = time()
+    invalid = {
+        league: t for league, t in invalid.items() if now - t < ttl.total_seconds()
+    }
+    found = dict()
+    candidates = list(candidates)
+    known = [public[kind] for kind in kinds if public.get(kind) in candidates]
+    candidates = list(dict.fromkeys(known)) + [
+        league for league in candidates if league not in invalid and league not in known
+    ]
+
+    limiter = RateLimiter(rate)
+    local = threading.local()
+
+    def check(league):
+        return probe(_thread_session(local, limiter), league)
+
+    leagues = iter(candidates)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = dict()
+
+        def submit(n):
+            for league in islice(leagues, n):
+                pending[executor.submit(check, league)] = league
+
+        submit(max_workers)
+        while pending and not set(kinds) <= set(found):
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=pending.get):
+                league = pending.pop(future)
+                count("leagues probed")
+                try:
+                    result = future.result()
+                except requests.RequestException as e:
+                    logger.warning("Probing league {} failed: {!r}".format(league, e))
+                    continue
+                if not result:
+                    logger.debug("{} is not a valid public league".format(league))
+                    invalid[league] = time()
+                for kind in sorted(result & set(kinds)):
+                    if kind not in found:
+                        logger.info(
+                            "{} is a valid public {} league".format(league, kind)
+                        )
+                        found[kind] = league
+            if not set(kinds) <= set(found):
+                submit(len(done))
+        for future in pending:
+            future.cancel()
+
+    for kind, league in found.items():
+        public[kind] = league
+    for kind in kinds:
+        if kind not in found and public.get(kind) in invalid:
+            del public[kind]
+    if filepath:
+        _save_probes(filepath, public, invalid)
+    return found
+
+
+def fail_over(is_IDP=False):
+    """Switch the scraper from a stale public league to a validated alternate
+
+    :param is_IDP: (bool) replace the public IDP league?
+    :return: league ID of the alternate
+    """
+    name = "PUBLIC_LEAGUE_IDP" if is_IDP else "PUBLIC_LEAGUE"
+    stale = getattr(scraper, name)
+    kind = "IDP" if is_IDP else "DEF"
+    found = find_public_leagues(
+        [league for league in LEAGUE_IDS if league != stale],
+        [kind],
+        rate=DISCOVERY_RATE,
+        filepath=PROBES_FILE,
+    )
+    if kind not in found:
+        raise RuntimeError("No public {} league found".format(kind))
+    logger.warning(
+        "Public league {} is stale, failing over to {}".format(stale, found[kind])
+    )
+    setattr(scraper, name, found[kind])
+    return found[kind]
@@ -0,0 +1,151 @@
+import cProfile
+import json
+import os
+import pstats
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from time import perf_counter
+
+# Tracer recording spans and counters of all threads, or None when not tracing
+_tracer = None
+
+
+class Tracer:
+    """Spans and counters recorded while tracing, see `trace()`"""
+
+    def __init__(self):
+        self.spans = []  # (name, thread ID, start, seconds, attributes)
+        self.counters = Counter()
+        self.profile = None  # pstats.Stats of the traced thread, if profiled
+        self.start = perf_counter()
+        self.seconds = None
+        self._lock = threading.Lock()
+
+    def add(self, name, start, seconds, attributes):
+        """Record a span"""
+        with self._lock:
+            self.spans.append(
+                (name, threading.get_ident(), start - self.start, seconds, attributes)
+            )
+
+    def count(self, name, n=1):
+        """Increase a counter"""
+        with self._lock:
+            self.counters[name] += n
+
+    def summary(self):
+        """Number, total, mean and maximum seconds of spans, by name"""
+        summary = dict()
+        for name, _, _, seconds, _ in self.spans:
+            s = summary.setdefault(name, dict(count=0, seconds=0.0, max=0.0))
+            s["count"] += 1
+            s["seconds"] += seconds
+            s["max"] = max(s["max"], seconds)
+        for s in summary.values():
+            s["mean"] = s["seconds"] / s["count"]
+        return summary
+
+    def to_dict(self):
+        """Spans, counters and summary, as JSON-serializable data"""
+        return dict(
+            seconds=self.seconds,
+            counters=dict(self.counters),
+            summary=self.summary(),
+            spans=[
+                dict(
+                    name=name, thread=thread, start=start, seconds=seconds, **attributes
+                )
+                for name, thread, start, seconds, attributes in self.spans
+            ],
+        )
+
+    def to_chrome_trace(self):
+        """Spans and counters in the Chrome trace event format, e.g. for Perfetto"""
+        pid = os.getpid()
+        events = [
+            dict(
+                name=name,
+                ph="X",
+                ts=start * 1e6,
+                dur=seconds * 1e6,
+                pid=pid,
+                tid=thread,
+                args=attributes,
+            )
+            for name, thread, start, seconds, attributes in self.spans
+        ]
+        events.append(
+            dict(
+                name="counters",
+                ph="C",
+                ts=(self.seconds or 0) * 1e6,
+                pid=pid,
+                args=dict(self.counters),
+            )
+        )
+        return dict(traceEvents=events, displayTimeUnit="ms")
+
+    def save(self, filepath, format="json"):
+        """Save the trace
+
+        :param format: "json" for `to_dict()`, or "chrome" for a Chrome trace that can
+            be opened in chrome://tracing or https://ui.perfetto.dev
+        """
+        data = self.to_chrome_trace() if format == "chrome" else self.to_dict()
+        with open(filepath, "w") as f:
+            json.dump(data, f, default=str)
+
+
+@contextmanager
+def trace(profile=False):
+    """Record spans and counters of scraping and optimizing, e.g.
+
+    >>> with ffbot.trace() as tracer:
+    ...     df_opt = ffbot.optimize(df, week, TEAM, POSITIONS)
+    >>> tracer.save("trace.json", format="chrome")
+
+    Spans and counters of all threads are recorded, but not of worker processes.
+
+    :param profile: (bool) also profile the calling thread with cProfile, into
+        `tracer.profile`
+    """
+    global _tracer
+    tracer = Tracer()
+    previous, _tracer = _tracer, tracer
+    profiler = cProfile.Profile() if profile else None
+    if profiler:
+        profiler.enable()
+    try:
+        yield tracer
+    finally:
+        if profiler:
+            profiler.disable()
+            tracer.profile = pstats.Stats(profiler)
+        tracer.seconds = perf_counter() - tracer.start
+        _tracer = previous
+
+
+@contextmanager
+def span(name, **attributes):
+    """Record the duration of a block while tracing
+
+    Yields the span's attributes, to add attributes at the end of the block. Can also
+    decorate a function.
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield attributes
+        return
+    start = perf_counter()
+    try:
+        yield attributes
+    finally:
+        tracer.add(name, start, perf_counter() - start, attributes)
+
+
+def count(name, n=1):
+    """Increase a counter while tracing"""
+    tracer = _tracer
+    if tracer is not None:
+        tracer.count(name, n)
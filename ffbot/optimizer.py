@@ -1,18 +1,14 @@
 from collections import Counter
+from dataclasses import dataclass, replace
+from typing import Callable
 
+import numpy as np
 import pandas as pd
 from loguru import logger
-from pulp import (
-    PULP_CBC_CMD,
-    LpBinary,
-    LpContinuous,
-    LpMaximize,
-    LpProblem,
-    LpStatus,
-    LpVariable,
-    lpSum,
-    value,
-)
+from pulp import LpBinary, LpContinuous, LpMaximize, LpProblem, LpVariable, lpSum, value
+
+from .instrumentation import count, span
+from .solver import MIP_GAP, new_session
 
 IR_STATUSES = {
     "COVID",  # e.g. COVID-19
@@ -21,17 +17,90 @@ IR_STATUSES = {
     "O",
     "PUP",  # e.g. PUP-R
 }
-SOLVER_SETTINGS = PULP_CBC_CMD(msg=0)
+WEEKLY_POINTS_INTEREST_RATE = 0.4
 
 
-def optimize(df, week, team, positions):
-    """Optimize player pick-ups from free agents and waivers"""
+@dataclass
+class Players:
+    """Columnar player data for the optimizer, one array element per player"""
 
-    # Settings
-    WEEKLY_POINTS_INTEREST_RATE = 0.4
+    ids: np.ndarray
+    names: np.ndarray
+    positions: np.ndarray
+    owners: np.ndarray
+    owner_ids: np.ndarray  # float, NaN if not owned
+    statuses: np.ndarray
+    free_agent: np.ndarray
+    available: np.ndarray
+    injured: np.ndarray
+    projections: np.ndarray  # players x weeks
+    vor: np.ndarray
+    times: list
 
-    # Game rules
-    positions = [x.strip() for x in positions.split(",")]
+    @classmethod
+    def from_df(cls, df, times):
+        """Extract player data from scraped data in bulk
+
+        :param df: scraped data, as returned by `scrape()` or `load()`, with either
+            compact or plain column types
+        :param times: (list) weeks to extract projections for
+        """
+        df = df.drop_duplicates("ID", keep="last")
+        owner_ids = df["Owner ID"].to_numpy(dtype=float, na_value=np.nan)
+        owners = df["Owner"].to_numpy(dtype=object)
+        statuses = df["Status"].to_numpy(dtype=object)
+        available = np.isnan(owner_ids)
+        injured = (
+            df["Status"]
+            .astype("string")
+            .str.split("-")
+            .str[0]
+            .isin(IR_STATUSES)
+            .to_numpy(dtype=bool)
+        )
+        columns = ["Week {}".format(t) for t in times]
+        projections = df[columns].to_numpy(dtype=float)
+        if (df[columns].dtypes == np.float32).any():
+            # Compact projections are float32 of values with 2 decimals
+            projections = projections.round(2)
+        return cls(
+            ids=df["ID"].to_numpy(),
+            names=df["Name"].to_numpy(dtype=object),
+            positions=df["Position"].to_numpy(dtype=object),
+            owners=owners,
+            owner_ids=owner_ids,
+            statuses=statuses,
+            free_agent=available & (owners == "Free Agent"),
+            available=available,
+            injured=injured,
+            projections=projections,
+            vor=df["VOR"].to_numpy(dtype=float),
+            times=list(times),
+        )
+
+    def take(self, indices):
+        """Player data for a subset of players"""
+        return Players(
+            **{
+                name: value if name == "times" else value[indices]
+                for name, value in vars(self).items()
+            }
+        )
+
+    def until(self, end_week):
+        """Player data of the weeks up to an end week"""
+        n_times = self.times.index(end_week) + 1
+        return replace(
+            self, projections=self.projections[:, :n_times], times=self.times[:n_times]
+        )
+
+
+def _possible_positions(positions, player_positions):
+    """Map each player position to the roster positions it can fill in this league
+
+    :param positions: (list) roster positions of the league, e.g. ["QB", "WR", "BN"]
+    :param player_positions: player positions, including multi-position e.g. "WR,RB"
+    """
     PossiblePositions = dict(
         QB={"QB", "Q/W/R/T"},
         WR={"WR", "W/R/T", "W/T", "W/R", "Q/W/R/T"},
@@ -55,7 +124,7 @@ def optimize(df, week, team, positions):
         key: values for key, values in PossiblePositions.items() if values
     }
     #  Players that can play multiple positions
-    for position in df["Position"].unique():
+    for position in player_positions:
         if position not in PossiblePositions:
             # There is a player that can play multiple positions, so consider those options too
             PossiblePositions[position] = set()
@@ -63,61 +132,173 @@ def optimize(df, week, team, positions):
                 n = n.strip()
                 if n in PossiblePositions:
                     PossiblePositions[position].update(PossiblePositions[n])
+    return PossiblePositions
+
+
+@dataclass
+class League:
+    """Pre-processed optimizer inputs for one team, keyed by player ID"""
+
+    players: list
+    times: list
+    positions: list  # distinct roster positions, in league order
+    position_max: Counter
+    names: dict
+    position: dict
+    owner: dict
+    roster0: dict
+    free_agent: dict
+    available: dict
+    vor: dict
+    discounts: dict
+    projections: dict  # keyed by (player, week)
+    player_positions: dict  # eligible roster positions of each player
+    position_players: dict  # eligible players of each roster position
+    player_starts: dict  # eligible roster positions that score points
+
+
+def _discounts(times, interest_rate=WEEKLY_POINTS_INTEREST_RATE):
+    """Discount factor of each week, with points of later weeks worth less"""
+    return {t: 1 / (1 + interest_rate) ** t_n for t_n, t in enumerate(times)}
+
+
+def preprocess(players, team, positions, interest_rate=WEEKLY_POINTS_INTEREST_RATE):
+    """Pre-process player data for one team
+
+    :param players: (Players) player data, with projections for the remaining weeks
+    :param interest_rate: (float) weekly interest rate of points
+    """
+
+    # Game rules
+    positions = [x.strip() for x in positions.split(",")]
+    PossiblePositions = _possible_positions(positions, pd.unique(players.positions))
     PositionMax = Counter(positions)
-    POSITIONS = PositionMax.keys()
+    POSITIONS = list(PositionMax.keys())
 
     # Pre-process data
-    TIMES = [t for t in range(week, 18)]
-    PLAYERS = set()
-    Names = dict()
-    Position = dict()
-    Roster0 = dict()
-    Owner = dict()
-    Status = dict()
-    FreeAgent = dict()
-    Available = dict()
-    Projections = dict()
-    VOR = dict()
-    for _, row in df.iterrows():
-        p = row["ID"]
-        PLAYERS.add(p)
-        Names[p] = row["Name"]
-        Position[p] = row["Position"]
-        owner_id = row["Owner ID"]
-        Roster0[p] = owner_id == team
-        owner = row["Owner"]
-        Owner[p] = owner
-        Status[p] = row["Status"]
-        FreeAgent[p] = pd.isna(owner_id) and owner == "Free Agent"
-        Available[p] = pd.isna(owner_id)
-        for t in TIMES:
-            Projections[p, t] = float(row["Week {}".format(t)])
-        VOR[p] = row["VOR"]
+    TIMES = players.times
+    PLAYERS = players.ids.tolist()
+    Position = dict(zip(PLAYERS, players.positions))
     #  create other parameters
-    Discounts = {
-        t: 1 / (1 + WEEKLY_POINTS_INTEREST_RATE) ** t_n for t_n, t in enumerate(TIMES)
+    Discounts = _discounts(TIMES, interest_rate)
+    Projections = {
+        (p, t): x
+        for p, row in zip(PLAYERS, players.projections.tolist())
+        for t, x in zip(TIMES, row)
     }
-    PlayerTime = [(p, t) for p in PLAYERS for t in TIMES]
-    PlayerPosition = [
-        (p, n)
-        for p in PLAYERS
-        for n in POSITIONS
-        if n in PossiblePositions[Position[p]]
-    ]
-    for p in PLAYERS:
+    #  index eligible positions per player, and eligible players per position
+    PlayerPositions = dict()
+    for p, injured in zip(PLAYERS, players.injured):
         # All players take bench position
-        PlayerPosition.append((p, "BN"))
+        eligible = PossiblePositions[Position[p]] | {"BN"}
         # All injured players can take IR position
-        if not pd.isna(Status[p]) and Status[p].split("-")[0] in IR_STATUSES:
-            PlayerPosition.append((p, "IR"))
+        if injured:
+            eligible = eligible | {"IR"}
+        PlayerPositions[p] = [n for n in POSITIONS if n in eligible]
+    PositionPlayers = {n: [] for n in POSITIONS}
+    for p in PLAYERS:
+        for n in PlayerPositions[p]:
+            PositionPlayers[n].append(p)
+    PlayerStarts = {
+        p: [n for n in PlayerPositions[p] if n not in ["BN", "IR"]] for p in PLAYERS
+    }
+
+    return League(
+        players=PLAYERS,
+        times=TIMES,
+        positions=POSITIONS,
+        position_max=PositionMax,
+        names=dict(zip(PLAYERS, players.names)),
+        position=Position,
+        owner=dict(zip(PLAYERS, players.owners)),
+        roster0=dict(zip(PLAYERS, players.owner_ids == team)),
+        free_agent=dict(zip(PLAYERS, players.free_agent)),
+        available=dict(zip(PLAYERS, players.available)),
+        vor=dict(zip(PLAYERS, players.vor)),
+        discounts=Discounts,
+        projections=Projections,
+        player_positions=PlayerPositions,
+        position_players=PositionPlayers,
+        player_starts=PlayerStarts,
+    )
+
+
+def _prune(league):
+    """IDs of players that can change the optimal adds and drops, see `prune()`"""
+    keep = {p for p in league.players if league.roster0[p]}
+
+    # Group players that can be added by their eligible positions
+    groups = dict()
+    for p in league.players:
+        if league.available[p] and not league.roster0[p]:
+            groups.setdefault(tuple(league.player_positions[p]), []).append(p)
+    for eligible, players in groups.items():
+        k = sum(league.position_max[n] for n in eligible if n not in ["BN", "IR"])
+        projections = np.array(
+            [[league.projections[p, t] for t in league.times] for p in players]
+        )
+        # Free agents are added before waiver claims, then break ties by order
+        rounds = np.array([0 if league.free_agent[p] else 1 for p in players])
+        order = np.arange(len(players))
+        at_least = (projections[:, None, :] >= projections[None, :, :]).all(axis=2)
+        dominates = (
+            at_least
+            & (rounds[:, None] <= rounds[None, :])
+            & (
+                ~at_least.T
+                | (rounds[:, None] < rounds[None, :])
+                | (order[:, None] < order[None, :])
+            )
+        )
+        keep.update(p for p, n in zip(players, dominates.sum(axis=0)) if n < k)
+    logger.info(
+        "Pruned {} of {} players".format(
+            len(league.players) - len(keep), len(league.players)
+        )
+    )
+    return keep
+
+
+def prune(df, week, team, positions):
+    """Remove players that cannot change the optimal adds and drops
+
+    Players owned by other teams can never be added. A player that can be added is
+    dominated by another with the same eligible positions, that can be added in the
+    same or an earlier round (free agents before waiver claims), and that projects at
+    least as many points every remaining week. If a player has as many dominators as
+    there are starting positions they are eligible for, then any of their starts can
+    be given to a dominator instead, so only the top-k non-dominated players are kept.
+
+    :return: scraped data without the pruned players
+    """
+    players = Players.from_df(df, range(week, 18))
+    keep = _prune(preprocess(players, team, positions))
+    return df[df["ID"].isin(keep)]
+
+
+@dataclass
+class Model:
+    """Optimization problem, and the variables and results needed to rank moves"""
+
+    prob: LpProblem
+    players: list  # players in the model
+    add: dict
+    drop: dict
+    evaluate: Callable  # returns (total points, discounted points, VOR) of solution
+    starts: dict = (
+        None  # assignments that score points, keyed by (player, week, position)
+    )
+
+
+def build_reference(league):
+    """Reference formulation, with points tracked by continuous variables"""
+    PLAYERS = league.players
+    TIMES = league.times
+    PlayerPositions = league.player_positions
+    PlayerTime = [(p, t) for p in PLAYERS for t in TIMES]
     PlayerTimePosition = [
-        (p, t, n)
-        for p in PLAYERS
-        for t in TIMES
-        for n in POSITIONS
-        if (p, n) in PlayerPosition
+        (p, t, n) for p in PLAYERS for t in TIMES for n in PlayerPositions[p]
     ]
-    logger.info("Optimizer pre-processed data")
 
     # Define optimization problem
     prob = LpProblem("football", LpMaximize)
@@ -139,200 +320,393 @@ def optimize(df, week, team, positions):
     # Define constraints
     prob += 0 >= lpSum(add[p] for p in PLAYERS), "max_adds"
     prob += (
-        0 == lpSum(add[p] for p in PLAYERS if not FreeAgent[p]),
+        0 == lpSum(add[p] for p in PLAYERS if not league.free_agent[p]),
         "only_add_free_agents",
     )
     for p, t in PlayerTime:
-        prob += roster[p] == lpSum(
-            assign[p, t, n] for n in POSITIONS if (p, n) in PlayerPosition
-        )
-        prob += points[p, t] == Projections[p, t] * lpSum(
-            assign[p, t, n]
-            for n in POSITIONS
-            if (p, n) in PlayerPosition
-            if n not in ["BN", "IR"]
-        )
-        prob += (
-            lpSum(assign[p, t, n] for n in POSITIONS if (p, n) in PlayerPosition) <= 1
+        prob += roster[p] == lpSum(assign[p, t, n] for n in PlayerPositions[p])
+        prob += points[p, t] == league.projections[p, t] * lpSum(
+            assign[p, t, n] for n in league.player_starts[p]
         )
+        prob += lpSum(assign[p, t, n] for n in PlayerPositions[p]) <= 1
     for p in PLAYERS:
-        if not Roster0[p]:
+        if not league.roster0[p]:
             prob += drop[p] == 0
-        if not Available[p]:
+        if not league.available[p]:
             prob += add[p] == 0
-        prob += roster[p] == Roster0[p] + add[p] - drop[p]
+        prob += roster[p] == league.roster0[p] + add[p] - drop[p]
         prob += points_total[p] == lpSum(points[p, t] for t in TIMES)
         prob += discounted_points_total[p] == lpSum(
-            Discounts[t] * points[p, t] for t in TIMES
+            league.discounts[t] * points[p, t] for t in TIMES
         )
     for t in TIMES:
-        for n in POSITIONS:
+        for n in league.positions:
             prob += (
-                lpSum(assign[p, t, n] for p in PLAYERS if (p, n) in PlayerPosition)
-                <= PositionMax[n]
+                lpSum(assign[p, t, n] for p in league.position_players[n])
+                <= league.position_max[n]
             )
-    logger.info("Optimizer starting...")
 
-    # Solve optimization problem
-    solutions_headers = ["Add", "Drop", "Total points", "Discounted points", "VOR"]
+    def evaluate():
+        total_points = sum(points_total[p].varValue for p in PLAYERS)
+        discounted_points = value(prob.objective)
+        vor = sum(league.vor[p] * roster[p].varValue for p in PLAYERS)
+        return total_points, discounted_points, vor
+
+    return Model(prob, PLAYERS, add, drop, evaluate)
+
+
+def build_reduced(league):
+    """Reduced formulation, with discounted projections as objective coefficients
+
+    Players that can never be on the roster (owned by other teams) are left out.
+    Roster and points variables are substituted out, add and drop restrictions become
+    variable bounds, and total points are calculated after each solve. Discounts only
+    appear in the objective, so they can be changed without rebuilding the model.
+    """
+    PLAYERS = [p for p in league.players if league.roster0[p] or league.available[p]]
+    TIMES = league.times
+    PlayerPositions = league.player_positions
+    PlayerTimePosition = [
+        (p, t, n) for p in PLAYERS for t in TIMES for n in PlayerPositions[p]
+    ]
+    PlayerTimeStart = [
+        (p, t, n) for p in PLAYERS for t in TIMES for n in league.player_starts[p]
+    ]
+
+    # Define optimization problem
+    prob = LpProblem("football", LpMaximize)
+
+    # Define decision variables
+    add = LpVariable.dicts("add", PLAYERS, cat=LpBinary)
+    drop = LpVariable.dicts("drop", PLAYERS, cat=LpBinary)
+    assign = LpVariable.dicts("assign", PlayerTimePosition, cat=LpBinary)
+    for p in PLAYERS:
+        if not league.roster0[p]:
+            drop[p].upBound = 0
+        if not league.available[p]:
+            add[p].upBound = 0
+
+    # Define objective function
+    prob += lpSum(
+        league.discounts[t] * league.projections[p, t] * assign[p, t, n]
+        for p, t, n in PlayerTimeStart
+    )
+
+    # Define constraints
+    prob += 0 >= lpSum(add[p] for p in PLAYERS), "max_adds"
+    prob += (
+        0 == lpSum(add[p] for p in PLAYERS if not league.free_agent[p]),
+        "only_add_free_agents",
+    )
+    for p in PLAYERS:
+        for t in TIMES:
+            prob += (
+                lpSum(assign[p, t, n] for n in PlayerPositions[p])
+                == league.roster0[p] + add[p] - drop[p]
+            )
+    for t in TIMES:
+        for n in league.positions:
+            prob += (
+                lpSum(assign[p, t, n] for p in league.position_players[n] if p in add)
+                <= league.position_max[n]
+            )
+
+    def evaluate():
+        total_points = sum(
+            league.projections[p, t] * assign[p, t, n].varValue
+            for p, t, n in PlayerTimeStart
+        )
+        discounted_points = value(prob.objective)
+        vor = sum(
+            league.vor[p] * (league.roster0[p] + add[p].varValue - drop[p].varValue)
+            for p in PLAYERS
+        )
+        return total_points, discounted_points, vor
+
+    starts = {(p, t, n): assign[p, t, n] for p, t, n in PlayerTimeStart}
+    return Model(prob, PLAYERS, add, drop, evaluate, starts)
+
+
+FORMULATIONS = dict(reference=build_reference, reduced=build_reduced)
+
+
+# Objective penalty of each move, at most the rounding of points in the output, and
+# the tolerance of comparing points
+MOVE_PENALTY = 0.01
+TOLERANCE = 1e-6
+
+
+def _penalties(model):
+    """Objective penalty of each add and drop, at most the rounding of the output
+
+    The penalties keep solvers from making moves that add no points, and break ties
+    between moves by player order, so every ranking makes the same moves. They are
+    large enough for the solvers' tolerances to tell them apart.
+    """
+    PLAYERS = model.players
+    penalty = MOVE_PENALTY / len(PLAYERS)
+    penalties = dict()
+    for i, p in enumerate(PLAYERS):
+        penalties[model.add[p]] = penalties[model.drop[p]] = -penalty * (
+            1 + i / len(PLAYERS)
+        )
+    return penalties
+
+
+def _points(model, penalties):
+    """Total points, discounted points and VOR of the solution, without penalties"""
+    total_points, discounted_points, vor = model.evaluate()
+    discounted_points -= sum(
+        coefficient * v.varValue for v, coefficient in penalties.items()
+    )
+    return total_points, discounted_points, vor
+
+
+def _rank(league, model, session):
+    """Rank player adds and drops, re-solving with one more move at a time"""
+    PLAYERS = model.players
+    add, drop = model.add, model.drop
+    Names = {p: f"{league.names[p]} ({league.position[p]})" for p in PLAYERS}
+    penalties = _penalties(model)
+    session.set_objective(penalties)
+
     solutions = []
-    prob.solve(SOLVER_SETTINGS)
-    assert LpStatus[prob.status] == "Optimal"
+    last = (0, 0, 0)
+
+    def record(this_add, this_drop):
+        nonlocal last
+        with span("extract"):
+            current = _points(model, penalties)
+        solutions.append(
+            [this_add, this_drop] + [x - x0 for x, x0 in zip(current, last)]
+        )
+        last = current
+
+    # Solve optimization problem, only dropping players that don't fit the roster
+    session.solve()
     known_drops = set()
     n_drops = 0
     for p in PLAYERS:
         if drop[p].varValue:
-            this_drop = f"{Names[p]} ({Position[p]})"
-            prob += drop[p] == 1
+            session.fix(drop[p])
             known_drops.add(p)
-            solutions.append(["", this_drop, None, None])
+            solutions.append(["", Names[p], None, None])
             n_drops += 1
-    total_points = sum(points_total[p].varValue for p in PLAYERS)
-    discounted_points = value(prob.objective)
-    vor = sum(VOR[p] * roster[p].varValue for p in PLAYERS)
-    solutions.append(["<current roster>", "", total_points, discounted_points, vor])
-    last_total_points = total_points
-    last_discounted_points = discounted_points
-    last_vor = vor
-    prob += n_drops >= lpSum(drop[p] for p in PLAYERS), "max_drops"
+    record("<current roster>", "")
+    session.add_limit("max_drops", (drop[p] for p in PLAYERS), n_drops)
 
     # Re-solve for each add without dropping any players
     known_adds = set()
     n_adds = 1
     while True:
-        prob.constraints["max_adds"].constant = -n_adds
-        prob.solve(SOLVER_SETTINGS)
-        assert LpStatus[prob.status] == "Optimal"
+        session.set_limit("max_adds", n_adds)
+        session.solve()
         this_add = ""
         for p in PLAYERS:
             if add[p].varValue and p not in known_adds:
-                this_add = f"{Names[p]} ({Position[p]})"
-                prob += add[p] == 1
+                this_add = Names[p]
+                session.fix(add[p])
                 known_adds.add(p)
         if this_add == "":
             break
         n_adds += 1
-        total_points = sum(points_total[p].varValue for p in PLAYERS)
-        discounted_points = value(prob.objective)
-        vor = sum(VOR[p] * roster[p].varValue for p in PLAYERS)
-        solutions.append(
-            [
-                this_add,
-                "",
-                total_points - last_total_points,
-                discounted_points - last_discounted_points,
-                vor - last_vor,
-            ]
-        )
-        last_total_points = total_points
-        last_discounted_points = discounted_points
-        last_vor = vor
+        record(this_add, "")
 
     # Re-solve for each drop to acquire a free agent
-    del prob.constraints["max_adds"]
+    session.relax("max_adds")
     while True:
         n_drops += 1
-        prob.constraints["max_drops"].constant = -n_drops
-        prob.solve(SOLVER_SETTINGS)
-        assert LpStatus[prob.status] == "Optimal"
+        session.set_limit("max_drops", n_drops)
+        session.solve()
         this_drop = ""
         this_add = ""
         for p in PLAYERS:
             if drop[p].varValue and p not in known_drops:
-                this_drop = f"{Names[p]} ({Position[p]})"
-                prob += drop[p] == 1
+                this_drop = Names[p]
+                session.fix(drop[p])
                 known_drops.add(p)
             elif add[p].varValue and p not in known_adds:
-                this_add = f"{Names[p]} ({Position[p]})"
-                prob += add[p] == 1
+                this_add = Names[p]
+                session.fix(add[p])
                 known_adds.add(p)
                 n_adds += 1
         if this_add == "" and this_drop == "":
             break
-        total_points = sum(points_total[p].varValue for p in PLAYERS)
-        discounted_points = value(prob.objective)
-        vor = sum(VOR[p] * roster[p].varValue for p in PLAYERS)
-        solutions.append(
-            [
-                this_add,
-                this_drop,
-                total_points - last_total_points,
-                discounted_points - last_discounted_points,
-                vor - last_vor,
-            ]
-        )
-        last_total_points = total_points
-        last_discounted_points = discounted_points
-        last_vor = vor
+        record(this_add, this_drop)
 
     # Re-solve for each waiver claim add without dropping any players
-    del prob.constraints["only_add_free_agents"]
-    prob += 0 >= lpSum(add[p] for p in PLAYERS), "max_adds"
+    session.relax("only_add_free_agents")
     while True:
-        prob.constraints["max_adds"].constant = -n_adds
-        prob.solve(SOLVER_SETTINGS)
-        assert LpStatus[prob.status] == "Optimal"
+        session.set_limit("max_adds", n_adds)
+        session.solve()
         this_add = ""
         for p in PLAYERS:
             if add[p].varValue and p not in known_adds:
-                this_add = f"{Names[p]} ({Position[p]}) - {Owner[p]}"
-                prob += add[p] == 1
+                this_add = f"{Names[p]} - {league.owner[p]}"
+                session.fix(add[p])
                 known_adds.add(p)
         if this_add == "":
             break
         n_adds += 1
-        total_points = sum(points_total[p].varValue for p in PLAYERS)
-        discounted_points = value(prob.objective)
-        vor = sum(VOR[p] * roster[p].varValue for p in PLAYERS)
-        solutions.append(
-            [
-                this_add,
-                "",
-                total_points - last_total_points,
-                discounted_points - last_discounted_points,
-                vor - last_vor,
-            ]
-        )
-        last_total_points = total_points
-        last_discounted_points = discounted_points
-        last_vor = vor
+        record(this_add, "")
 
     # Re-solve for each drop to acquire a waiver claim
-    del prob.constraints["max_adds"]
+    session.relax("max_adds")
     while True:
-        prob.constraints["max_drops"].constant = -n_drops
-        prob.solve(SOLVER_SETTINGS)
-        assert LpStatus[prob.status] == "Optimal"
+        session.set_limit("max_drops", n_drops)
+        session.solve()
         this_drop = ""
         this_add = ""
         for p in PLAYERS:
             if drop[p].varValue and p not in known_drops:
-                this_drop = f"{Names[p]} ({Position[p]})"
-                prob += drop[p] == 1
+                this_drop = Names[p]
+                session.fix(drop[p])
                 known_drops.add(p)
             elif add[p].varValue and p not in known_adds:
-                this_add = f"{Names[p]} ({Position[p]}) - {Owner[p]}"
-                prob += add[p] == 1
+                this_add = f"{Names[p]} - {league.owner[p]}"
+                session.fix(add[p])
                 known_adds.add(p)
         if this_add == "" and this_drop == "":
             break
         n_drops += 1
-        total_points = sum(points_total[p].varValue for p in PLAYERS)
-        discounted_points = value(prob.objective)
-        vor = sum(VOR[p] * roster[p].varValue for p in PLAYERS)
+        record(this_add, this_drop)
+
+    session.set_objective({v: 0 for v in penalties})
+    return solutions
+
+
+def _rank_bounded(league, model, session):
+    """Rank player adds and drops like `_rank()`, usually with fewer solves
+
+    Each loop of `_rank()` first solves with its limit lifted, for the most points
+    that any number of moves can reach. Moves are then ranked one at a time as before,
+    but the loop stops without a final solve once that bound is reached, and the last
+    move is taken from the unlimited solution while it is still feasible. Every move
+    has the same small penalty as in `_rank()`, so both make the same moves. A loop
+    takes one more solve than in `_rank()` when the moves ranked one at a time can't
+    reach the bound.
+    """
+    PLAYERS = model.players
+    add, drop = model.add, model.drop
+    Names = {p: f"{league.names[p]} ({league.position[p]})" for p in PLAYERS}
+    variables = model.prob.variables()
+    unlimited = len(PLAYERS)
+    penalties = _penalties(model)
+    session.set_objective(penalties)
+
+    solutions = []
+    last = (0, 0, 0)
+    known = dict(add=set(), drop=set())
+
+    def points():
+        return _points(model, penalties)
+
+    def record(this_add, this_drop):
+        nonlocal last
+        with span("extract"):
+            current = points()
         solutions.append(
-            [
-                this_add,
-                this_drop,
-                total_points - last_total_points,
-                discounted_points - last_discounted_points,
-                vor - last_vor,
-            ]
+            [this_add, this_drop] + [x - x0 for x, x0 in zip(current, last)]
         )
-        last_total_points = total_points
-        last_discounted_points = discounted_points
-        last_vor = vor
+        last = current
+
+    variables_of = dict(add=add, drop=drop)
+
+    def new_moves(kinds):
+        """New moves of the solution, as a dict of kind to players"""
+        return {
+            kind: [
+                p
+                for p in PLAYERS
+                if variables_of[kind][p].varValue and p not in known[kind]
+            ]
+            for kind in kinds
+        }
+
+    def take(moves, waivers):
+        """Fix moves and record them as one step"""
+        names = dict(add="", drop="")
+        for kind, players in moves.items():
+            for p in players:
+                session.fix(variables_of[kind][p])
+                known[kind].add(p)
+                names[kind] = Names[p]
+                if kind == "add" and waivers:
+                    names[kind] += f" - {league.owner[p]}"
+        record(names["add"], names["drop"])
+
+    def rank(limit, kind, kinds, waivers=False):
+        """Rank the moves of one loop of `_rank()`
+
+        :param limit: name of the constraint limiting moves of `kind` per step
+        :param kinds: kinds of moves to take at each step
+        """
+        variable = variables_of[kind]
+        session.set_limit(limit, unlimited)
+        session.solve()
+        bound = points()[1]
+        moves = new_moves(kinds)
+        if len(moves[kind]) <= 1:
+            # At most one step, which needs no further solve
+            if any(moves.values()):
+                take(moves, waivers)
+        else:
+            solution = {v: v.varValue for v in variables}
+            while True:
+                session.set_limit(limit, len(known[kind]) + 1)
+                session.solve()
+                moves = new_moves(kinds)
+                if not any(moves.values()):
+                    break
+                take(moves, waivers)
+                if points()[1] >= bound - TOLERANCE:
+                    break
+                # The unlimited solution is optimal for the last step, if it has all
+                # moves taken so far
+                fixed = [add[p] for p in known["add"]] + [
+                    drop[p] for p in known["drop"]
+                ]
+                left = [
+                    p for p in PLAYERS if solution[variable[p]] and p not in known[kind]
+                ]
+                if all(solution[v] for v in fixed) and len(left) == 1:
+                    for v, x in solution.items():
+                        v.varValue = x
+                    take(new_moves(kinds), waivers)
+                    break
+        session.set_limit(limit, len(known[kind]) + 1)
+
+    # Solve optimization problem, only dropping players that don't fit the roster
+    session.solve()
+    moves = new_moves(["drop"])
+    for p in moves["drop"]:
+        session.fix(drop[p])
+        known["drop"].add(p)
+        solutions.append(["", Names[p], None, None])
+    record("<current roster>", "")
+    session.add_limit("max_drops", (drop[p] for p in PLAYERS), len(known["drop"]))
+
+    # Rank adds without dropping players, drops to acquire free agents, waiver claim
+    # adds without dropping players, and drops to acquire waiver claims
+    rank("max_adds", "add", ["add"])
+    session.relax("max_adds")
+    rank("max_drops", "drop", ["drop", "add"])
+    session.relax("only_add_free_agents")
+    rank("max_adds", "add", ["add"], waivers=True)
+    session.relax("max_adds")
+    rank("max_drops", "drop", ["drop", "add"], waivers=True)
+
+    session.set_objective({v: 0 for v in penalties})
+    return solutions
+
+
+RANKINGS = dict(stepwise=_rank, bounded=_rank_bounded)
+
 
+@span("output")
+def _to_frame(solutions):
+    """Format ranked moves as a DataFrame"""
+    solutions_headers = ["Add", "Drop", "Total points", "Discounted points", "VOR"]
     df_opt = pd.DataFrame(solutions, columns=solutions_headers)
     df_opt = df_opt.round(2)
     for col, dtype in df_opt.dtypes.items():
@@ -340,5 +714,125 @@ def optimize(df, week, team, positions):
             # Allow missing values
             df_opt[col] = df_opt[col].astype("object")
     df_opt.fillna("", inplace=True)
+    return df_opt
+
+
+@span("preprocess")
+def _league(players, team, positions, pruning=False, **options):
+    """Pre-process player data for one team, optionally pruning players first"""
+    league = preprocess(players, team, positions, **options)
+    if pruning:
+        with span("prune"):
+            keep = _prune(league)
+        players = players.take(np.isin(players.ids, list(keep)))
+        league = preprocess(players, team, positions, **options)
+    logger.info("Optimizer pre-processed data")
+    return league
+
+
+def _build(league, formulation="reduced"):
+    """Build the model of a formulation"""
+    with span("build", formulation=formulation):
+        model = FORMULATIONS[formulation](league)
+    count("variables", model.prob.numVariables())
+    count("constraints", model.prob.numConstraints())
+    return model
+
+
+def _session(prob, solver="cbc", **options):
+    """Solver session for a problem"""
+    return new_session(prob, solver, **options)
+
+
+def _reprice(league, model, session, interest_rate=WEEKLY_POINTS_INTEREST_RATE):
+    """Reset a solver session to rank moves again, with points discounted by an
+    interest rate"""
+    league.discounts.update(_discounts(league.times, interest_rate))
+    session.reset()
+    session.set_objective(
+        {
+            assign: league.discounts[t] * league.projections[p, t]
+            for (p, t, n), assign in model.starts.items()
+        }
+    )
+
+
+def solve(
+    players,
+    team,
+    positions,
+    solver="cbc",
+    formulation="reduced",
+    pruning=False,
+    interest_rate=WEEKLY_POINTS_INTEREST_RATE,
+    time_limit=None,
+    gap=MIP_GAP,
+    threads=None,
+    ranking="stepwise",
+):
+    """Optimize player pick-ups for one team from pre-processed player data
+
+    See `optimize()` for the options.
+    """
+    league = _league(players, team, positions, pruning, interest_rate=interest_rate)
+    model = _build(league, formulation)
+    logger.info("Optimizer starting...")
+    session = _session(
+        model.prob, solver, time_limit=time_limit, gap=gap, threads=threads
+    )
+    solutions = RANKINGS[ranking](league, model, session)
+    logger.info("Optimizer solved {} times".format(session.solves))
+    df_opt = _to_frame(solutions)
+    df_opt.attrs["solves"] = session.solves
     logger.info("Optimizer finished")
     return df_opt
+
+
+def optimize(
+    df,
+    week,
+    team,
+    positions,
+    solver="cbc",
+    formulation="reduced",
+    pruning=False,
+    interest_rate=WEEKLY_POINTS_INTEREST_RATE,
+    end_week=17,
+    time_limit=None,
+    gap=MIP_GAP,
+    threads=None,
+    ranking="stepwise",
+):
+    """Optimize player pick-ups from free agents and waivers
+
+    :param solver: "cbc" to solve with CBC via PuLP, or "highs" to re-solve one
+        in-process HiGHS model (requires highspy, falls back to CBC without it)
+    :param formulation: "reduced" for the compact model, or "reference" for the
+        original model with explicit points variables
+    :param pruning: (bool) first remove players that cannot change the solution
+    :param interest_rate: (float) weekly interest rate of points, higher values favor
+        points in the next weeks over points later in the season
+    :param end_week: last week to optimize for
+    :param time_limit: (float) seconds per solve, keeping the best solution found
+    :param gap: (float) relative MIP gap to stop each solve at, 0 for the same
+        results from every solver
+    :param threads: (int) number of solver threads
+    :param ranking: "stepwise" to re-solve with one more move at a time, or "bounded"
+        to also solve each step's unlimited problem first, for the same moves from
+        usually fewer solves. The number of solves is in `df_opt.attrs["solves"]`
+    """
+    with span("players"):
+        players = Players.from_df(df, range(week, end_week + 1))
+    return solve(
+        players,
+        team,
+        positions,
+        solver,
+        formulation,
+        pruning,
+        interest_rate,
+        time_limit,
+        gap,
+        threads,
+        ranking,
+    )
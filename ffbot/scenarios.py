@@ -0,0 +1,225 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from itertools import product, repeat
+from os import cpu_count
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from .optimizer import (
+    WEEKLY_POINTS_INTEREST_RATE,
+    Players,
+    _build,
+    _discounts,
+    _league,
+    _rank,
+    _reprice,
+    _session,
+    _to_frame,
+    solve,
+)
+
+# Relative standard deviation of sampled projections
+PROJECTION_NOISE = 0.3
+
+# Player data of a sweep or simulation, and (league, model, solver session) of each end week, in a
+# worker process
+_worker = dict()
+_models = dict()
+
+
+def _init_worker(players, team, positions, solver, pruning):
+    _models.clear()
+    _worker.update(
+        players=players, team=team, positions=positions, solver=solver, pruning=pruning
+    )
+
+
+def _model(end_week):
+    """League, model and solver session of a horizon, built on first use"""
+    if end_week not in _models:
+        players = _worker["players"].until(end_week)
+        league = _league(
+            players, _worker["team"], _worker["positions"], _worker["pruning"]
+        )
+        model = _build(league)
+        _models[end_week] = (league, model, _session(model.prob, _worker["solver"]))
+    return _models[end_week]
+
+
+def _run(interest_rate, end_week):
+    """Rank moves for one scenario, only changing the objective of its horizon"""
+    league, model, session = _model(end_week)
+    _reprice(league, model, session, interest_rate)
+    return _to_frame(_rank(league, model, session))
+
+
+def sweep(
+    df,
+    week,
+    team,
+    positions,
+    interest_rates=(WEEKLY_POINTS_INTEREST_RATE,),
+    end_weeks=(17,),
+    max_workers=None,
+    solver="cbc",
+    pruning=False,
+):
+    """Optimize player pick-ups for a grid of interest rates and horizons
+
+    The optimization problem of each end week is built at most once per worker
+    process. Scenarios with the same end week only change its objective, discounting
+    points by their interest rate, and then rank moves like `optimize()`.
+
+    :param interest_rates: (list) weekly interest rates of points
+    :param end_weeks: (list) last weeks to optimize for
+    :param max_workers: (int) number of worker processes, defaults to CPU count
+    :param solver: "cbc" or "highs", see `optimize()`
+    :param pruning: (bool) first remove players that cannot change the solution
+    :return: DataFrame of ranked moves per scenario, with the `optimize()` columns
+        after "Interest rate" and "End week" columns
+    """
+    startTime = perf_counter()
+    players = Players.from_df(df, range(week, max(end_weeks) + 1))
+    scenarios = list(product(interest_rates, end_weeks))
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(players, team, positions, solver, pruning),
+    ) as executor:
+        results = list(executor.map(_run, *zip(*scenarios)))
+
+    for (interest_rate, end_week), df_opt in zip(scenarios, results):
+        df_opt.insert(0, "Interest rate", interest_rate)
+        df_opt.insert(1, "End week", end_week)
+    logger.info(
+        "Optimized {} scenarios in {:.1f} seconds".format(
+            len(scenarios), perf_counter() - startTime
+        )
+    )
+    return pd.concat(results, ignore_index=True)
+
+
+def _simulate(samples, interest_rate, end_week, waivers):
+    """Optimal adds and drops of each projection sample, re-solving one model"""
+    league, model, session = _model(end_week)
+    league.discounts.update(_discounts(league.times, interest_rate))
+    players = _worker["players"]
+    rows = {p: i for i, p in enumerate(players.ids.tolist())}
+    columns = {t: i for i, t in enumerate(players.times)}
+    variables = list(model.starts.values())
+    index_p = np.array([rows[p] for p, t, n in model.starts])
+    index_t = np.array([columns[t] for p, t, n in model.starts])
+    discounts = np.array([league.discounts[t] for p, t, n in model.starts])
+
+    # Allow any number of moves, each sample starts from the previous solution
+    session.reset()
+    session.relax("max_adds")
+    if waivers:
+        session.relax("only_add_free_agents")
+    moves = []
+    for sample in samples:
+        coefficients = discounts * sample[index_p, index_t]
+        session.set_objective(dict(zip(variables, coefficients.tolist())))
+        session.solve()
+        moves.append(
+            (
+                [p for p in model.players if model.add[p].varValue],
+                [p for p in model.players if model.drop[p].varValue],
+            )
+        )
+    return moves
+
+
+def _sample(projections, n_samples, noise, rng):
+    """Sample projections of all players and weeks at once, samples x players x weeks"""
+    if callable(noise):
+        return noise(rng, projections, n_samples)
+    shape = (n_samples,) + projections.shape
+    return projections * (1 + noise * rng.standard_normal(shape))
+
+
+def simulate(
+    df,
+    week,
+    team,
+    positions,
+    n_samples=100,
+    noise=PROJECTION_NOISE,
+    seed=None,
+    method="scenarios",
+    waivers=True,
+    max_workers=None,
+    solver="cbc",
+    interest_rate=WEEKLY_POINTS_INTEREST_RATE,
+    end_week=17,
+):
+    """Optimize player pick-ups for random samples of projections
+
+    Projections of every player and week are sampled at once. With the "scenarios"
+    method, worker processes each build the optimization problem once, and re-solve
+    it for their share of samples with only the objective changed. With the "average"
+    method, moves are ranked like `optimize()` for the sample-average projections,
+    which is the sample-average model since points are linear in projections.
+
+    :param n_samples: (int) number of projection samples
+    :param noise: (float) relative standard deviation of normal projection errors, or
+        a function (rng, projections, n_samples) returning samples x players x weeks
+    :param seed: seed of the random number generator
+    :param method: "scenarios" to solve each sample, or "average" for one solve of the
+        sample-average projections
+    :param waivers: (bool) consider waiver claims, besides free agents
+    :param max_workers: (int) number of worker processes, defaults to CPU count
+    :param solver: "cbc" or "highs", see `optimize()`
+    :param interest_rate: (float) weekly interest rate of points, see `optimize()`
+    :param end_week: last week to optimize for
+    :return: with "scenarios", a DataFrame of the probability that each add or drop is
+        optimal, and with "average", ranked moves like `optimize()`
+    """
+    startTime = perf_counter()
+    players = Players.from_df(df, range(week, end_week + 1))
+    rng = np.random.default_rng(seed)
+    samples = _sample(players.projections, n_samples, noise, rng)
+    if method == "average":
+        players = replace(players, projections=samples.mean(axis=0))
+        return solve(players, team, positions, solver, interest_rate=interest_rate)
+
+    # Solve samples in parallel, one chunk of samples per worker
+    n_chunks = min(max_workers or cpu_count() or 1, n_samples)
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(players, team, positions, solver, False),
+    ) as executor:
+        moves = executor.map(
+            _simulate,
+            np.array_split(samples, n_chunks),
+            repeat(interest_rate),
+            repeat(end_week),
+            repeat(waivers),
+        )
+        counts = Counter()
+        for adds, drops in (move for chunk in moves for move in chunk):
+            counts.update(("Add", p) for p in adds)
+            counts.update(("Drop", p) for p in drops)
+
+    names = {
+        p: f"{name} ({position})"
+        for p, name, position in zip(players.ids, players.names, players.positions)
+    }
+    df_moves = pd.DataFrame(
+        [[move, p, names[p], count / n_samples] for (move, p), count in counts.items()],
+        columns=["Move", "ID", "Player", "Probability"],
+    )
+    df_moves = df_moves.sort_values(
+        ["Move", "Probability"], ascending=[True, False], ignore_index=True
+    )
+    logger.info(
+        "Optimized {} samples in {:.1f} seconds".format(
+            n_samples, perf_counter() - startTime
+        )
+    )
+    return df_moves
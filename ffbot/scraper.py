@@ -1,26 +1,192 @@
+import json
+import math
 import re
-from datetime import datetime
-from io import StringIO
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from itertools import islice
+from os import makedirs, remove, replace
+from os.path import dirname, exists, join
+from time import monotonic, sleep, time
+from urllib.parse import urlparse
 
-import numpy as np
-import pandas as pd
+import lxml.html
 import requests
-from bs4 import BeautifulSoup as bs
 from loguru import logger
+from lxml import etree
 from requests.adapters import HTTPAdapter
-from tqdm import tqdm
+from requests.structures import CaseInsensitiveDict
 from urllib3.util import Retry
 from user_agent import generate_user_agent
 
+from .instrumentation import count, span
+
+# Yahoo fantasy football, or a stand-in server e.g. for benchmarks
+BASE_URL = "https://football.fantasysports.yahoo.com/f1"
 # A public league for current week and player IDs
 PUBLIC_LEAGUE = 101
 PUBLIC_LEAGUE_IDP = 283
 SEARCH_PLAYER_GROUPS = ["QB", "WR", "RB", "TE", "K", "DEF"]
 SEARCH_PLAYER_GROUPS_IDP = ["QB", "WR", "RB", "TE", "K", "D", "DB", "DL", "LB"]
+# Switch to another public league when one goes stale, see `ffbot.discovery`
+FAIL_OVER = True
+
+# Player universe and current week are shared by all league scrapes for this long
+CONTEXT_TTL = timedelta(hours=1)
+
+# Concurrency limits
+MAX_WORKERS = 8
+REQUESTS_PER_SECOND = 10  # per host, shared by all workers
+SESSION_REQUESTS = 100  # new session (and user-agent pool) every 100 requests
+
+# Scraped players are appended to a checkpoint in batches of this size, and resumed
+# for this long
+CHECKPOINT_BATCH = 100
+CHECKPOINT_TTL = timedelta(hours=6)
+
+
+def _has_class(name):
+    """XPath condition of an element having a CSS class"""
+    return "contains(concat(' ', normalize-space(@class), ' '), ' {} ')".format(name)
+
+
+# Compiled XPath expressions for parsing pages
+_PLAYER_ROWS = etree.XPath("(//*[@id='players-table']//table)[1]/tbody/tr")
+_PLAYER_ID = etree.XPath(
+    ".//*[{}]//a/@data-ys-playerid".format(_has_class("player-status"))
+)
+_PLAYER_TEAM = etree.XPath(
+    ".//*[{}]//*[{}]//span".format(_has_class("ysf-player-name"), _has_class("D-b"))
+)
+_PLAYERINFO = etree.XPath("//*[{}]".format(_has_class("playerinfo")))
+_NAME = etree.XPath(".//*[{}]".format(_has_class("name")))
+_TEAM_NAME = etree.XPath(".//*[{}]".format(_has_class("player-team-name")))
+_POSITION = etree.XPath(".//dd[{}]".format(_has_class("pos")))
+_OWNER = etree.XPath(".//dd[{}]".format(_has_class("owner")))
+_OWNER_HREF = etree.XPath(".//dd[{}]//a/@href".format(_has_class("owner")))
+_STATUS = etree.XPath(".//*[{}]".format(_has_class("status")))
+_OWNED = etree.XPath(".//dd[{}]".format(_has_class("owned")))
+_TABLES = etree.XPath("//table")
+_HEADER = etree.XPath("(.//tr[th])[last()]/th")
+_ROWS = etree.XPath(".//tr[td]")
+
+
+def _parse_html(text):
+    """Parse HTML into an element tree"""
+    if not text or not text.strip():
+        return lxml.html.fromstring("<html></html>")
+    return lxml.html.fromstring(text)
+
+
+def _text(elements):
+    """Text content of the first element"""
+    return elements[0].text_content()
+
+
+class RateLimiter:
+    """Thread-safe limit on the number of requests per second to each host"""
+
+    def __init__(self, rate=REQUESTS_PER_SECOND):
+        self.interval = 1 / rate if rate else 0
+        self._lock = threading.Lock()
+        self._next = dict()
+
+    def wait(self, host):
+        """Block until the next request to host is allowed"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = monotonic()
+            start = max(now, self._next.get(host, now))
+            self._next[host] = start + self.interval
+        if start > now:
+            sleep(start - now)
+
 
+class LimitedRetry(Retry):
+    """Retry that waits on a rate limiter before each retry, so that retries also
+    count against the per-host rate"""
 
-def create_session():
-    """Create requests session with retries and random user-agent"""
+    def __init__(self, *args, limiter=None, host=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.limiter = limiter
+        self.host = host
+
+    def new(self, **kw):
+        kw.setdefault("limiter", self.limiter)
+        kw.setdefault("host", self.host)
+        return super().new(**kw)
+
+    def increment(self, *args, **kwargs):
+        retry = super().increment(*args, **kwargs)
+        if kwargs.get("_pool") is not None:
+            retry.host = kwargs["_pool"].host
+        return retry
+
+    def sleep(self, response=None):
+        super().sleep(response)
+        if self.limiter:
+            with span("rate limit"):
+                self.limiter.wait(self.host)
+
+
+class ScraperAdapter(HTTPAdapter):
+    """HTTP adapter that serves cached responses, or waits on a rate limiter"""
+
+    def __init__(self, limiter=None, cache=None, **kwargs):
+        self.limiter = limiter
+        self.cache = cache
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        cache = self.cache if request.method == "GET" else None
+        cached = None
+        if cache:
+            cached = cache.get(request.url)
+            if cached and cache.is_fresh(request.url, cached[0]):
+                cache.count("hits")
+                count("cache hits")
+                return cache.response(request, *cached)
+            if cache.offline:
+                raise requests.ConnectionError(
+                    "{} is not cached".format(request.url), request=request
+                )
+            if cached:
+                # Revalidate stale response
+                headers = CaseInsensitiveDict(cached[0]["headers"])
+                if "ETag" in headers:
+                    request.headers["If-None-Match"] = headers["ETag"]
+                if "Last-Modified" in headers:
+                    request.headers["If-Modified-Since"] = headers["Last-Modified"]
+        url = urlparse(request.url)
+        if self.limiter:
+            with span("rate limit"):
+                self.limiter.wait(url.hostname)
+        with span("http", endpoint=url.path.rstrip("/").split("/")[-1]) as attributes:
+            r = super().send(request, **kwargs)
+            attributes["status"] = r.status_code
+        count("requests")
+        retries = getattr(r.raw, "retries", None)
+        if retries is not None and retries.history:
+            count("retries", len(retries.history))
+        if cache:
+            if r.status_code == 304 and cached:
+                cache.count("revalidated")
+                cache.touch(request.url, cached[0])
+                return cache.response(request, *cached)
+            cache.count("misses")
+            if r.status_code == 200:
+                cache.put(request.url, r)
+        return r
+
+
+def create_session(limiter=None, cache=None):
+    """Create requests session with retries and random user-agent
+
+    :param limiter: (RateLimiter) optional rate limiter shared between sessions
+    :param cache: (ResponseCache) optional cache of responses
+    """
     s = requests.Session()
     s.headers = {
         "Accept": "text/html",
@@ -30,171 +196,561 @@ def create_session():
         "User-Agent": generate_user_agent(),
     }
     #  add retry loop
-    retry = Retry(backoff_factor=0.6, status_forcelist=[500, 502, 503, 504, 999])
-    adapter = HTTPAdapter(max_retries=retry)
+    retry = LimitedRetry(
+        backoff_factor=0.6,
+        status_forcelist=[500, 502, 503, 504, 999],
+        limiter=limiter,
+    )
+    adapter = ScraperAdapter(limiter, cache, max_retries=retry)
     s.mount("http://", adapter)
     s.mount("https://", adapter)
     return s
 
 
-def scrape(league, is_IDP: bool = False):
-    """Scrape data
+def _thread_session(local, limiter, cache=None):
+    """Session for the current worker thread, renewed every SESSION_REQUESTS"""
+    n = getattr(local, "n", 0)
+    if n % SESSION_REQUESTS == 0:
+        local.s = create_session(limiter, cache)
+    local.n = n + 1
+    return local.s
 
-    :param league: league ID
-    :param is_IDP: (bool) is this a individual defense player (IDP) league?
-    """
 
-    # Start timer
-    startTime = datetime.now()
+def get_player_ids(group, is_IDP=False, limiter=None, cache=None):
+    """Scrape player IDs and teams of one position group from a public league
 
-    # Scrape player IDs and teams from a public league
+    :param group: position group, e.g. "QB"
+    :param is_IDP: (bool) search the public IDP league?
+    :param limiter: (RateLimiter) optional rate limiter
+    :param cache: (ResponseCache) optional cache of responses
+    """
+    logger.info("Scraping all {}...".format(group))
     data = set()
+    s = create_session(limiter, cache)
+    i = 0
+    while True:
+        # Request next 25 best players
+        s.headers["User-Agent"] = generate_user_agent()
+        r = s.get(
+            "{}/{}/players".format(
+                BASE_URL, PUBLIC_LEAGUE_IDP if is_IDP else PUBLIC_LEAGUE
+            ),
+            params=dict(
+                count=i * 25,
+                pos=group,
+                sort="PR_S",  # sort by projected season rank
+                stat1="K_K",  # ranks
+                status="ALL",
+            ),
+        )
+        i += 1
+        with span("parse", page="players"):
+            rows = _PLAYER_ROWS(_parse_html(r.text))
+        if not rows:
+            break
+        for row in rows:
+            ID = _PLAYER_ID(row)[0]
+            ID = int(ID)
+            team = _PLAYER_TEAM(row)[0].text_content()
+            team = team.split()[0]
+            data.add((ID, team))
+    return data
+
+
+@dataclass
+class LeagueContext:
+    """Player universe and current week, the same for every league
+
+    :param players: sorted (ID, team) of all players in the public league
+    :param week: current season week
+    :param is_IDP: (bool) are individual defensive players included?
+    :param base_url: URL the context was discovered from
+    :param updated: (float) time of discovery, in seconds since the epoch
+    """
+
+    players: list
+    week: int
+    is_IDP: bool = False
+    base_url: str = BASE_URL
+    updated: float = 0.0
+
+    def is_fresh(self, ttl=CONTEXT_TTL):
+        """Was the context discovered less than `ttl` ago, from the current URL?"""
+        return self.base_url == BASE_URL and time() - self.updated < ttl.total_seconds()
+
+    def save(self, folder):
+        """Save the context to a folder, to share it with other processes"""
+        if not exists(folder):
+            makedirs(folder)
+        path = join(folder, _context_file(self.is_IDP))
+        tmp = "{}.{}.tmp".format(path, threading.get_ident())
+        with open(tmp, "w") as f:
+            json.dump(asdict(self), f)
+        replace(tmp, path)
+
+    @classmethod
+    def load(cls, folder, is_IDP=False):
+        """Load a saved context, or None"""
+        try:
+            with open(join(folder, _context_file(is_IDP))) as f:
+                context = cls(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        context.players = [tuple(player) for player in context.players]
+        return context
+
+
+def _context_file(is_IDP):
+    return "league-context-idp.json" if is_IDP else "league-context.json"
+
+
+# Contexts of this process, by is_IDP
+_contexts = dict()
+_contexts_lock = threading.Lock()
+
+
+def league_context(
+    is_IDP: bool = False,
+    ttl: timedelta = CONTEXT_TTL,
+    folder: str = None,
+    max_workers: int = MAX_WORKERS,
+    limiter=None,
+    cache=None,
+):
+    """Player universe and current week, discovered at most once per `ttl`
+
+    The context is shared by every scrape in this process, and with other processes
+    through `folder`.
+
+    :param is_IDP: (bool) include individual defensive players (IDP)?
+    :param ttl: (timedelta) maximum age of a shared context
+    :param folder: folder to share the context in across processes, e.g.
+        "data/context", or None to only share it within this process
+    :param max_workers: (int) number of concurrent requests
+    :param limiter: (RateLimiter) optional rate limiter
+    :param cache: (ResponseCache) optional cache of responses
+    """
+    with _contexts_lock:
+        context = _contexts.get(is_IDP)
+        if context is None or not context.is_fresh(ttl):
+            if folder is not None:
+                context = LeagueContext.load(folder, is_IDP)
+            if context is None or not context.is_fresh(ttl):
+                context = _discover(is_IDP, max_workers, limiter, cache)
+                if folder is not None:
+                    context.save(folder)
+            _contexts[is_IDP] = context
+    return context
+
+
+def _discover(is_IDP, max_workers, limiter, cache):
+    """Scrape player IDs and teams from a public league, one position group per
+    worker, and the current week
+
+    If the public league lists no players, fails over to another public league.
+    """
     groups = SEARCH_PLAYER_GROUPS_IDP if is_IDP else SEARCH_PLAYER_GROUPS
-    s = create_session()
-    for group in groups:
-        logger.info("Scraping all {}...".format(group))
-        i = 0
-        while True:
-            # Request next 25 best players
-            s.headers["User-Agent"] = generate_user_agent()
-            r = s.get(
-                "https://football.fantasysports.yahoo.com/f1/{}/players".format(
-                    PUBLIC_LEAGUE_IDP if is_IDP else PUBLIC_LEAGUE
-                ),
-                params=dict(
-                    count=i * 25,
-                    pos=group,
-                    sort="PR_S",  # sort by projected season rank
-                    stat1="K_K",  # ranks
-                    status="ALL",
-                ),
+    with span("player ids"), ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+        def player_ids():
+            return set().union(
+                *executor.map(
+                    lambda group: get_player_ids(group, is_IDP, limiter, cache), groups
+                )
             )
-            i += 1
-            soup = bs(r.text, "lxml")
-            table = soup.select_one("#players-table table")
-            if not table:
-                break
-            rows = table.select("tbody tr")
-            if not rows:
-                break
-            for row in rows:
-                ID = row.select_one(".player-status a")["data-ys-playerid"]
-                ID = int(ID)
-                team = row.select_one(".ysf-player-name .D-b span").text
-                team = team.split()[0]
-                data.add((ID, team))
 
-    # Create dataframe
-    df = pd.DataFrame(data, columns=["ID", "Team"])
+        players = player_ids()
+        if not players and FAIL_OVER:
+            from .discovery import fail_over
 
-    # Scrape projections
-    def get_projections(row):
-        # New session every 100 players
-        global s
-        if row.name % 100 == 0:
-            s = create_session()
-
-        pid = row["ID"]
-        url = "https://football.fantasysports.yahoo.com/f1/{}/playernote".format(league)
-        params = {"pid": pid}
-        s.headers["User-Agent"] = generate_user_agent()
-        r = s.get(url, params=params)
+            fail_over(is_IDP)
+            players = player_ids()
+    logger.info("Discovered {} players".format(len(players)))
+    return LeagueContext(
+        sorted(players), current_week(cache), is_IDP, BASE_URL, updated=time()
+    )
+
+
+def get_projections(s, league, pid):
+    """Scrape a player's details and weekly projections
+
+    :param s: requests session
+    :param league: league ID
+    :param pid: player ID
+    :return: (dict) player record
+    """
+    url = "{}/{}/playernote".format(BASE_URL, league)
+    params = {"pid": pid}
+    s.headers["User-Agent"] = generate_user_agent()
+    r = s.get(url, params=params)
+    with span("parse", page="playernote"):
         html = r.json()["content"]
-        soup = bs(html, "lxml")
-        playerinfo = soup.select_one(".playerinfo")
-        row["Name"] = playerinfo.select_one(".name").text
-        # row['Team'] = playerinfo.select_one('.player-team-name').text
-        row["Position"] = playerinfo.select_one("dd.pos").text[:-1]
-        row["Owner"] = playerinfo.select_one("dd.owner").text[:-1]
-
-        # Owner ID
-        a = playerinfo.select_one("dd.owner a")
-        if a:
-            row["Owner ID"] = int(a["href"].split("/")[-1])
+        return parse_playernote(html)
+
+
+def stream_projections(
+    league, players, max_workers=MAX_WORKERS, limiter=None, cache=None, quarantine=None
+):
+    """Scrape players' details and weekly projections, yielding records as they are
+    parsed
+
+    At most two requests per worker are in flight at a time. Players whose request or
+    playernote fails are logged and quarantined, instead of aborting the scrape.
+
+    :param league: league ID
+    :param players: (ID, team) of players to scrape
+    :param max_workers: (int) number of concurrent requests
+    :param limiter: (RateLimiter) optional rate limiter
+    :param cache: (ResponseCache) optional cache of responses
+    :param quarantine: (dict) optional dict to add failed player IDs to, with errors
+    """
+    local = threading.local()
+
+    def get_record(item):
+        ID, team = item
+        s = _thread_session(local, limiter, cache)
+        row = get_projections(s, league, ID)
+        return dict(ID=ID, Name=row.pop("Name"), Team=team, **row)
+
+    players = iter(players)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = dict()
+
+        def submit(n):
+            for item in islice(players, n):
+                pending[executor.submit(get_record, item)] = item
+
+        submit(2 * max_workers)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            submit(len(done))
+            for future in done:
+                ID, _ = pending.pop(future)
+                try:
+                    yield future.result()
+                except Exception as e:
+                    logger.warning("Quarantined player {}: {!r}".format(ID, e))
+                    count("quarantined")
+                    if quarantine is not None:
+                        quarantine[ID] = repr(e)
+
+
+class Checkpoint:
+    """Append-only JSON Lines file of scraped player records, to resume a scrape
+
+    The first line identifies the scrape, and each later line is a player record.
+    Records are appended in batches, so at most one batch is lost if the scrape is
+    interrupted. A checkpoint of another league, week or URL, or one started longer
+    than `ttl` ago, is ignored.
+
+    :param filepath: path of the checkpoint file
+    :param league: league ID
+    :param is_IDP: (bool) is this an IDP league?
+    :param week: current week of the scrape
+    :param batch_size: (int) number of records per append
+    :param ttl: (timedelta) maximum age of a checkpoint to resume from
+    """
+
+    def __init__(
+        self,
+        filepath,
+        league,
+        is_IDP=False,
+        week=None,
+        batch_size=CHECKPOINT_BATCH,
+        ttl=CHECKPOINT_TTL,
+    ):
+        self.filepath = filepath
+        self.header = dict(league=league, is_IDP=is_IDP, week=week, base_url=BASE_URL)
+        self.batch_size = batch_size
+        self.ttl = ttl
+        self.started = None
+        self._batch = []
+
+    def load(self):
+        """Records of an earlier scrape of the same league, or an empty list"""
+        records = []
+        try:
+            with open(self.filepath) as f:
+                header = json.loads(next(f))
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break  # partly written last line
+        except (OSError, ValueError, StopIteration):
+            return records
+        if {k: header.get(k) for k in self.header} != self.header:
+            logger.warning("Ignoring checkpoint of another scrape")
+            return []
+        try:
+            started = datetime.fromisoformat(header["started"])
+        except (KeyError, TypeError, ValueError):
+            started = None
+        if started is None or datetime.now() - started > self.ttl:
+            logger.warning("Ignoring checkpoint started over {} ago".format(self.ttl))
+            return []
+        self.started = header["started"]
+        return records
+
+    def start(self, started):
+        """Start a new checkpoint, unless an earlier one was loaded"""
+        if self.started is not None:
+            return
+        self.started = started
+        folder = dirname(self.filepath)
+        if folder and not exists(folder):
+            makedirs(folder)
+        with open(self.filepath, "w") as f:
+            f.write(json.dumps(dict(self.header, started=started)) + "\n")
+
+    def append(self, record):
+        """Append a record, writing a batch once it is full"""
+        self._batch.append(record)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write the records of the current batch"""
+        if not self._batch:
+            return
+        with open(self.filepath, "a") as f:
+            f.writelines(json.dumps(record) + "\n" for record in self._batch)
+        self._batch = []
+
+    def remove(self):
+        """Remove the checkpoint, once the scrape is complete"""
+        self._batch = []
+        try:
+            remove(self.filepath)
+        except OSError:
+            pass
+
+
+def parse_playernote(html):
+    """Parse a player's details and weekly projections from a playernote
+
+    :param html: content of the playernote
+    :return: (dict) player record
+    """
+    tree = _parse_html(html)
+    playerinfo = _PLAYERINFO(tree)[0]
+    row = dict()
+    row["Name"] = _text(_NAME(playerinfo))
+    # row['Team'] = _text(_TEAM_NAME(playerinfo))
+    row["Position"] = _text(_POSITION(playerinfo))[:-1]
+    row["Owner"] = _text(_OWNER(playerinfo))[:-1]
+
+    # Owner ID
+    href = _OWNER_HREF(playerinfo)
+    if href:
+        row["Owner ID"] = int(href[0].split("/")[-1])
+    else:
+        row["Owner ID"] = math.nan
+
+    # Status
+    status = _STATUS(playerinfo)
+    if status:
+        row["Status"] = status[0].text_content()
+    else:
+        row["Status"] = math.nan
+
+    row["% Owned"] = _text(_OWNED(playerinfo)).split()[0]
+
+    # Weekly projections, from the first table
+    tables = _TABLES(tree)
+    if not tables:
+        return row
+    header = [th.text_content().strip() for th in _HEADER(tables[0])]
+    if "Week" not in header or "Fan Pts" not in header:
+        return row
+    i_week, i_points = header.index("Week"), header.index("Fan Pts")
+    for cells in _ROWS(tables[0]):
+        if len(cells) <= max(i_week, i_points):
+            continue
+        week = "Week {}".format(cells[i_week].text_content().strip())
+        points = cells[i_points].text_content().strip()
+        if points in ("", "-"):
+            # Bye week
+            row[week] = 0
+        elif points[0] == "*":
+            # Game hasn't occured yet
+            row[week] = float(points[1:])
         else:
-            row["Owner ID"] = np.nan
+            # Game completed
+            row[week] = float(points)
 
-        # Status
-        status = playerinfo.select_one(".status")
-        if status:
-            row["Status"] = status.text
+    return row
+
+
+@span("scrape")
+def scrape(
+    league,
+    is_IDP: bool = False,
+    max_workers: int = MAX_WORKERS,
+    rate: float = REQUESTS_PER_SECOND,
+    previous=None,
+    ttl: timedelta = None,
+    cache=None,
+    context: LeagueContext = None,
+    checkpoint: str = None,
+):
+    """Scrape data
+
+    Player IDs, teams and the current week come from `league_context()`, which is
+    shared by the scrapes of every league, so each scrape only requests playernotes.
+
+    Players whose playernote fails are left out and listed, with their errors, in
+    `df.attrs["quarantined"]`. With a `checkpoint` file, scraped players are saved as
+    they are parsed, and a scrape that was interrupted, or quarantined players,
+    resumes from it, only scraping players that are missing. Only a checkpoint of the
+    same week, started less than `CHECKPOINT_TTL` ago, is resumed. The checkpoint is
+    removed once every player is scraped.
+
+    To refresh an earlier scrape, pass it as `previous`, with a `ttl`. Only players
+    that are new, changed team, or were scraped longer than `ttl` ago are scraped
+    again, and the rest are reused. Ownership and status changes are only picked up
+    after `ttl`, since the public league player lists don't include them.
+
+    :param league: league ID
+    :param is_IDP: (bool) is this a individual defense player (IDP) league?
+    :param max_workers: (int) number of concurrent requests
+    :param rate: (float) maximum requests per second to Yahoo, or None for no limit
+    :param previous: (DataFrame) earlier scraped data of this league, e.g. from `load()`
+    :param ttl: (timedelta) maximum age of reused players, required with `previous`
+    :param cache: (ResponseCache) optional cache of responses, e.g. to debug offline
+    :param context: (LeagueContext) player universe and current week, defaults to
+        `league_context(is_IDP)`
+    :param checkpoint: filepath of a checkpoint to save progress to and resume from,
+        e.g. "data/checkpoint.jsonl"
+    """
+
+    # Imported here, so that e.g. `current_week()` doesn't import pandas
+    import pandas as pd
+    from tqdm import tqdm
+
+    from .utils import compact, vor
+
+    if previous is not None and ttl is None:
+        raise ValueError(
+            "A ttl is required with previous, to pick up ownership and status changes"
+        )
+
+    # Start timer
+    startTime = datetime.now()
+    limiter = RateLimiter(rate)
+
+    # Player IDs and teams, shared by all leagues
+    if context is None:
+        context = league_context(
+            is_IDP, max_workers=max_workers, limiter=limiter, cache=cache
+        )
+    data = context.players
+
+    # Reuse unchanged players from previous scrape
+    reused = None
+    if previous is not None:
+        reused = previous.drop(columns=["Remaining", "VOR"], errors="ignore")
+        reused = reused[reused.set_index(["ID", "Team"]).index.isin(data)]
+        if "Updated" in reused:
+            updated = pd.to_datetime(reused["Updated"])
+            reused = reused[updated >= startTime - ttl]
         else:
-            row["Status"] = np.nan
-
-        row["% Owned"] = playerinfo.select_one("dd.owned").text.split()[0]
-
-        # Weekly projections
-        df2 = pd.read_html(StringIO(html))[0]
-        for _, row2 in df2.iterrows():
-            week = "Week {}".format(row2["Week"])
-            points = row2.get("Fan Pts")
-            if points is None:
-                continue
-            elif pd.isna(points) or points == "-":
-                # Bye week
-                row[week] = 0
-                # row[week + ' projection'] = 0
-                # row[week + ' actual'] = 0
-            elif points[0] == "*":
-                # Game hasn't occured yet
-                row[week] = float(points[1:])
-                # row[week + ' projection'] = float(points[1:])
-                # row[week + ' actual'] = np.nan
-            else:
-                # Game completed
-                row[week] = float(points)
-                # row[week + ' projection'] = np.nan
-                # row[week + ' actual'] = float(points)
+            reused = reused.iloc[:0]
+        reused_ids = set(reused["ID"])
+        data = [(ID, team) for ID, team in data if ID not in reused_ids]
+        logger.info(
+            "Reusing {} players, scraping {} players".format(len(reused), len(data))
+        )
 
-        return row
+    # Resume from checkpoint
+    records = []
+    if checkpoint is not None:
+        checkpoint = Checkpoint(checkpoint, league, is_IDP, context.week)
+        records = checkpoint.load()
+        if reused is not None:
+            records = [record for record in records if record["ID"] not in reused_ids]
+        if records:
+            fetched = {record["ID"] for record in records}
+            data = [(ID, team) for ID, team in data if ID not in fetched]
+            logger.info(
+                "Resuming {} players from checkpoint, scraping {} players".format(
+                    len(records), len(data)
+                )
+            )
+        checkpoint.start(startTime.isoformat(timespec="seconds"))
+    resumed = len(records)
 
-    tqdm.pandas(desc="Scraping weekly forecasts")
-    df = df.progress_apply(get_projections, axis=1)
+    # Scrape projections
+    quarantined = dict()
+    with span("projections"):
+        for record in tqdm(
+            stream_projections(league, data, max_workers, limiter, cache, quarantined),
+            total=len(data),
+            desc="Scraping weekly forecasts",
+        ):
+            records.append(record)
+            if checkpoint is not None:
+                checkpoint.append(record)
+    if checkpoint is not None:
+        if quarantined:
+            checkpoint.flush()
+        else:
+            checkpoint.remove()
+    if quarantined:
+        logger.warning("Quarantined {} players".format(len(quarantined)))
 
-    # Remove players without projections
-    df = df[~pd.isna(df["Week 1"])]
+    # Create dataframe
+    with span("dataframe"):
+        updated = [startTime.isoformat(timespec="seconds")] * len(records)
+        if resumed:
+            updated[:resumed] = [checkpoint.started] * resumed
+        order = sorted(range(len(records)), key=lambda i: records[i]["ID"])
+        df = pd.DataFrame([records[i] for i in order])
+        df["Updated"] = [updated[i] for i in order]
+        if reused is not None:
+            df = pd.concat([reused, df], ignore_index=True)
 
-    # Reorder columns
-    columns = list(df.columns)
-    columns[2], columns[1] = columns[1], columns[2]
-    df = df[columns]
+        # Remove players without projections
+        df = df[~pd.isna(df["Week 1"])]
 
     # Calculate VOR
-    columns = ["Week {}".format(i) for i in range(current_week(), 18)]
-    df["Remaining"] = df[columns].sum(axis=1)
-    available = df.loc[df["Owner ID"].isnull()]
-    means = (
-        available.groupby(["Position"])["Remaining"].nlargest(3).groupby(level=0).mean()
-    )
-    for positions in means.index:
-        if "," in positions:
-            for position in positions.split(","):
-                position = position.strip()
-                if position not in means:
-                    means[position] = means[positions]
-    df["VOR"] = df.apply(
-        lambda row: row["Remaining"]
-        - max(means[n.strip()] for n in row["Position"].split(",")),
-        axis=1,
-    )
-    df.sort_values(by="VOR", ascending=False, inplace=True)
-    df = df.round(2)
+    with span("vor"):
+        df = vor(df, context.week)
+    with span("compact"):
+        df = df.round(2)
+        df = compact(df)
 
+    df.attrs["quarantined"] = quarantined
     logger.info("Total runtime: {}".format(datetime.now() - startTime))
     return df
 
 
-def current_week():
-    """Current season week"""
+def _week_match(s):
+    """Match of the current week on the week page of the public league, or None"""
+    s.headers["User-Agent"] = generate_user_agent()
+    r = s.get("{}/{}/1".format(BASE_URL, PUBLIC_LEAGUE))
+    return re.search(r"Week (\d+)", _parse_html(r.text).text_content())
+
+
+def current_week(cache=None):
+    """Current season week
+
+    If the public league has no current week, fails over to another public league.
+
+    :param cache: (ResponseCache) optional cache of responses
+    """
 
     # Parse current week from a public league
-    s = create_session()
-    url = "https://football.fantasysports.yahoo.com/f1/{}/1".format(PUBLIC_LEAGUE)
-    s.headers["User-Agent"] = generate_user_agent()
-    r = s.get(url)
-    soup = bs(r.text, "lxml")
-    REGEX_PATTERN = r"Week (\d+)"
-    m = re.search(REGEX_PATTERN, soup.text)
+    s = create_session(cache=cache)
+    m = _week_match(s)
+    if m is None and FAIL_OVER:
+        from .discovery import fail_over
+
+        fail_over()
+        m = _week_match(s)
+    if m is None:
+        raise ValueError("No current week in public league {}".format(PUBLIC_LEAGUE))
     week = m.group(1)
     week = int(week)
 
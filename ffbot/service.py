@@ -0,0 +1,309 @@
+"""Long-running optimizer service with a local HTTP/JSON API, e.g.
+
+    ffbot serve 123456 --port 8080
+    curl -d '{"league": 123456, "team": 1}' http://127.0.0.1:8080/optimize
+
+Scraped data, models and results stay in memory between requests, see `Service`.
+"""
+
+import json
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter
+from urllib.parse import urlparse
+
+import pandas as pd
+from loguru import logger
+
+from .optimizer import (
+    RANKINGS,
+    WEEKLY_POINTS_INTEREST_RATE,
+    Players,
+    _build,
+    _league,
+    _reprice,
+    _session,
+    _to_frame,
+)
+from .scraper import league_context, scrape
+from .utils import load, save
+
+REFRESH_INTERVAL = timedelta(hours=6)
+POSITIONS = "QB, WR, WR, WR, RB, RB, TE, W/R/T, K, DEF, BN, BN, BN, BN, IR"
+# Options of optimize requests, with defaults
+OPTIONS = dict(
+    positions=POSITIONS,
+    interest_rate=WEEKLY_POINTS_INTEREST_RATE,
+    end_week=17,
+    pruning=False,
+    solver="cbc",
+    ranking="stepwise",
+)
+# Options that change the model, rather than only its objective or ranking
+MODEL_OPTIONS = ["positions", "end_week", "pruning", "solver"]
+
+
+@dataclass
+class Snapshot:
+    """Scraped data of a league, pre-processed for the optimizer"""
+
+    df: pd.DataFrame
+    week: int
+    players: Players
+    version: int
+    updated: datetime
+
+
+class Service:
+    """Optimizer service that keeps leagues warm in memory
+
+    Each league's scraped data is pre-processed once per snapshot, and refreshed on a
+    schedule. The model and solver session of each (league, team, positions, end
+    week) are built once per snapshot, and re-solved for other interest rates.
+    Results are cached by snapshot version, so repeat requests return immediately.
+
+    :param leagues: (list) league IDs to serve
+    :param is_IDP: (bool) are the leagues IDP leagues?
+    :param refresh: (timedelta) time between scrapes of each league, or None to never
+        refresh
+    :param snapshots: (bool) start from the latest saved snapshot of each league, and
+        save a snapshot after each scrape
+    :param scrape_options: other arguments for `scrape()`, e.g. rate=5
+    """
+
+    def __init__(
+        self,
+        leagues=(),
+        is_IDP=False,
+        refresh=REFRESH_INTERVAL,
+        snapshots=True,
+        **scrape_options,
+    ):
+        self.is_IDP = is_IDP
+        self.refresh_interval = refresh
+        self.snapshots = snapshots
+        self.scrape_options = scrape_options
+        self.leagues = dict()  # Snapshot by league ID
+        self.results = dict()  # response by (league, version, team, options)
+        self.models = dict()  # (league, model, session) by snapshot and options
+        self._lock = threading.Lock()
+        self._model_locks = dict()
+        self._stop = threading.Event()
+        self._threads = []
+        self._server = None
+        self.url = None
+        for league in leagues:
+            self.add_league(league)
+
+    def add_league(self, league, df=None, week=None):
+        """Serve a league, from scraped data or else its latest snapshot or a scrape"""
+        if df is None and self.snapshots:
+            try:
+                df, week = load(league=league)
+            except FileNotFoundError:
+                df = None
+        if df is None:
+            self.refresh(league)
+        else:
+            self._update(league, df, week)
+
+    def refresh(self, league):
+        """Scrape a league again"""
+        context = league_context(self.is_IDP)
+        df = scrape(league, self.is_IDP, context=context, **self.scrape_options)
+        if self.snapshots:
+            save(df, context.week, league)
+        self._update(league, df, context.week)
+
+    def _update(self, league, df, week):
+        """Replace the snapshot of a league, and forget its models and results"""
+        players = Players.from_df(df, range(week, 18))
+        with self._lock:
+            version = self.leagues[league].version + 1 if league in self.leagues else 1
+            self.leagues[league] = Snapshot(df, week, players, version, datetime.now())
+            for cache in (self.results, self.models, self._model_locks):
+                for key in [key for key in cache if key[0] == league]:
+                    del cache[key]
+        logger.info("League {} at version {}".format(league, version))
+
+    def optimize(self, league, team, **options):
+        """Ranked moves of a team, as a JSON-serializable dict
+
+        :param options: positions, interest_rate, end_week, pruning, solver and
+            ranking, see `optimize()`
+        """
+        startTime = perf_counter()
+        unknown = set(options) - set(OPTIONS)
+        if unknown:
+            raise ValueError("Unknown options {}".format(sorted(unknown)))
+        options = dict(OPTIONS, **options)
+        if options["ranking"] not in RANKINGS:
+            raise ValueError("Unknown ranking {}".format(options["ranking"]))
+        snapshot = self.leagues[league]
+        key = (league, snapshot.version, team, tuple(sorted(options.items())))
+        result = self.results.get(key)
+        cached = result is not None
+        if not cached:
+            # One model per snapshot and model options, solved by one thread at a time
+            model_key = (league, snapshot.version, team)
+            model_key += tuple(options[k] for k in MODEL_OPTIONS)
+            with self._lock:
+                lock = self._model_locks.setdefault(model_key, threading.Lock())
+            with lock:
+                result = self.results.get(key)
+                if result is None:
+                    result = self._solve(snapshot, model_key, team, options)
+                    self.results[key] = result
+        return dict(result, cached=cached, seconds=perf_counter() - startTime)
+
+    def _solve(self, snapshot, model_key, team, options):
+        """Rank moves, building the model on first use and else re-solving it"""
+        if model_key not in self.models:
+            league = _league(
+                snapshot.players.until(options["end_week"]),
+                team,
+                options["positions"],
+                options["pruning"],
+            )
+            model = _build(league)
+            session = _session(model.prob, options["solver"])
+            self.models[model_key] = (league, model, session)
+        league, model, session = self.models[model_key]
+        solves = session.solves
+        _reprice(league, model, session, options["interest_rate"])
+        df_opt = _to_frame(RANKINGS[options["ranking"]](league, model, session))
+        return dict(
+            league=model_key[0],
+            team=team,
+            week=snapshot.week,
+            version=snapshot.version,
+            updated=snapshot.updated.isoformat(timespec="seconds"),
+            options=options,
+            solves=session.solves - solves,
+            moves=df_opt.to_dict("records"),
+        )
+
+    def status(self):
+        """Snapshot of each league, as a JSON-serializable dict"""
+        return dict(
+            leagues={
+                league: dict(
+                    week=snapshot.week,
+                    version=snapshot.version,
+                    updated=snapshot.updated.isoformat(timespec="seconds"),
+                    players=len(snapshot.df),
+                )
+                for league, snapshot in self.leagues.items()
+            },
+            models=len(self.models),
+            results=len(self.results),
+        )
+
+    def _refresh_loop(self):
+        """Refresh every league on schedule, until stopped"""
+        while not self._stop.wait(self.refresh_interval.total_seconds()):
+            for league in list(self.leagues):
+                try:
+                    self.refresh(league)
+                except Exception as e:
+                    logger.warning(
+                        "Refreshing league {} failed: {!r}".format(league, e)
+                    )
+
+    def start(self, host="127.0.0.1", port=8080):
+        """Serve the HTTP API and refresh leagues in background threads"""
+        self._stop.clear()
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.service = self
+        self.url = "http://{}:{}".format(host, self._server.server_port)
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, daemon=True)
+        ]
+        if self.refresh_interval is not None:
+            self._threads.append(
+                threading.Thread(target=self._refresh_loop, daemon=True)
+            )
+        for thread in self._threads:
+            thread.start()
+        logger.info("Serving {} leagues at {}".format(len(self.leagues), self.url))
+        return self
+
+    def stop(self):
+        """Stop serving and refreshing"""
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start() if self._server is None else self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """JSON API of a service
+
+    GET /status lists leagues, POST /optimize with a JSON object of league, team and
+    options ranks moves, and POST /refresh with a league scrapes it again.
+    """
+
+    def do_GET(self):
+        if urlparse(self.path).path.rstrip("/") == "/status":
+            self._respond(200, self.server.service.status())
+        else:
+            self._respond(404, dict(error="Not found"))
+
+    def do_POST(self):
+        service = self.server.service
+        path = urlparse(self.path).path.rstrip("/")
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            league = body.pop("league")
+            if league not in service.leagues:
+                self._respond(404, dict(error="Unknown league {}".format(league)))
+            elif path == "/optimize":
+                team = body.pop("team")
+                self._respond(200, service.optimize(league, team, **body))
+            elif path == "/refresh":
+                service.refresh(league)
+                self._respond(200, service.status()["leagues"][league])
+            else:
+                self._respond(404, dict(error="Not found"))
+        except (KeyError, TypeError, ValueError) as e:
+            self._respond(400, dict(error="Bad request: {!r}".format(e)))
+        except Exception as e:
+            logger.exception("Request failed")
+            self._respond(500, dict(error="{!r}".format(e)))
+
+    def _respond(self, status, data):
+        body = json.dumps(data, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def serve(leagues, host="127.0.0.1", port=8080, **options):
+    """Serve leagues until interrupted
+
+    :param leagues: (list) league IDs
+    :param options: other arguments for `Service`
+    """
+    service = Service(leagues, **options).start(host, port)
+    try:
+        service._stop.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
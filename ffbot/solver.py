@@ -0,0 +1,265 @@
+from time import perf_counter
+
+import numpy as np
+from loguru import logger
+from pulp import (
+    PULP_CBC_CMD,
+    LpInteger,
+    LpMaximize,
+    LpSolutionIntegerFeasible,
+    LpSolutionOptimal,
+    lpSum,
+)
+
+from .instrumentation import count, span
+
+try:
+    import highspy
+except ImportError:  # optional dependency
+    highspy = None
+
+# Relative MIP gap, solve to optimality for the same results from every solver
+MIP_GAP = 0.0
+
+
+class SolverSession:
+    """Re-solve one problem as its limits and fixed variables change
+
+    Each re-solve only changes the right-hand side of limit constraints or the bounds
+    of fixed variables, and CBC is warm-started from the previous solution, which
+    stays feasible because limits are only loosened and only chosen moves are fixed.
+    CBC runs as a subprocess, so PuLP still writes the model out for every solve.
+
+    Other solver backends implement the same methods, see `SOLVERS`.
+
+    :param time_limit: (float) seconds per solve, keeping the best solution found
+    :param gap: (float) relative MIP gap to stop at
+    :param threads: (int) number of solver threads
+    """
+
+    def __init__(self, prob, time_limit=None, gap=MIP_GAP, threads=None):
+        self.prob = prob
+        self.solver = PULP_CBC_CMD(
+            msg=0, warmStart=True, timeLimit=time_limit, gapRel=gap, threads=threads
+        )
+        self.solves = 0
+        self._relaxed = dict()
+        self._bounds = [(v, v.lowBound, v.upBound) for v in prob.variables()]
+        self._constraints = dict(prob.constraints.items())
+        self._constants = {
+            name: constraint.constant for name, constraint in self._constraints.items()
+        }
+
+    def add_limit(self, name, variables, limit):
+        """Add a `limit >= lpSum(variables)` constraint"""
+        self.prob += limit >= lpSum(variables), name
+
+    def set_limit(self, name, limit):
+        """Set the right-hand side of a limit constraint, restoring it if relaxed"""
+        if name in self._relaxed:
+            self.prob += self._relaxed.pop(name), name
+        self.prob.constraints[name].constant = -limit
+
+    def relax(self, name):
+        """Remove a constraint until its limit is set again"""
+        self._relaxed[name] = self.prob.constraints[name]
+        del self.prob.constraints[name]
+
+    def fix(self, variable, value=1):
+        """Fix a variable to a value, by its bounds rather than an extra constraint"""
+        variable.lowBound = value
+        variable.upBound = value
+
+    def set_objective(self, coefficients):
+        """Change objective coefficients, as a dict of variable to coefficient"""
+        for variable, coefficient in coefficients.items():
+            self.prob.objective[variable] = coefficient
+
+    def reset(self):
+        """Undo limits, relaxations and fixed variables, and forget the solution"""
+        self.prob.constraints.clear()
+        self.prob.constraints.update(self._constraints)
+        for name, constant in self._constants.items():
+            self.prob.constraints[name].constant = constant
+        self._relaxed.clear()
+        for variable, lower, upper in self._bounds:
+            variable.lowBound = lower
+            variable.upBound = upper
+            variable.varValue = None
+
+    def solve(self):
+        """Solve problem, starting from the previous solution"""
+        with span("solve", solver="cbc") as attributes:
+            self.prob.solve(self.solver)
+            # Including writing the model and reading the solution
+            attributes["solver_seconds"] = self.prob.solutionTime
+        self.solves += 1
+        count("solves")
+        # Optimal, or feasible when stopped at the time limit
+        assert self.prob.sol_status in (LpSolutionOptimal, LpSolutionIntegerFeasible)
+
+
+class HighsSession(SolverSession):
+    """Re-solve one problem in-process with a persistent HiGHS model
+
+    The PuLP problem is translated once, and later changes are applied to the HiGHS
+    model in memory, so there is no model file, solver process, or solution file per
+    solve. Each MIP solve is started from the previous solution.
+    """
+
+    def __init__(self, prob, time_limit=None, gap=MIP_GAP, threads=None):
+        if highspy is None:
+            raise ImportError(
+                "HiGHS solver requires highspy, `pip install ffbot[highs]`"
+            )
+        super().__init__(prob)
+        self.variables = prob.variables()
+        self.columns = {v.name: i for i, v in enumerate(self.variables)}
+        self.rows = dict()
+        self.highs = highspy.Highs()
+        self.highs.setOptionValue("output_flag", False)
+        self.highs.setOptionValue("mip_rel_gap", gap)
+        self.highs.setOptionValue("mip_abs_gap", 0)
+        if time_limit is not None:
+            self.highs.setOptionValue("time_limit", float(time_limit))
+        if threads is not None:
+            self.highs.setOptionValue("threads", threads)
+        self._solution = None
+
+        # Translate objective and variables
+        inf = highspy.kHighsInf
+        lp = highspy.HighsLp()
+        lp.num_col_ = len(self.variables)
+        lp.sense_ = (
+            highspy.ObjSense.kMaximize
+            if prob.sense == LpMaximize
+            else highspy.ObjSense.kMinimize
+        )
+        lp.offset_ = prob.objective.constant
+        lp.col_cost_ = np.array([prob.objective.get(v, 0.0) for v in self.variables])
+        lp.col_lower_ = np.array(
+            [-inf if v.lowBound is None else v.lowBound for v in self.variables]
+        )
+        lp.col_upper_ = np.array(
+            [inf if v.upBound is None else v.upBound for v in self.variables]
+        )
+        lp.integrality_ = [
+            (
+                highspy.HighsVarType.kInteger
+                if v.cat == LpInteger
+                else highspy.HighsVarType.kContinuous
+            )
+            for v in self.variables
+        ]
+
+        # Translate constraints, row-wise
+        lower, upper, start, index, values = [], [], [0], [], []
+        for i, (name, constraint) in enumerate(prob.constraints.items()):
+            self.rows[name] = i
+            lb, ub = constraint.getLb(), constraint.getUb()
+            lower.append(-inf if lb is None else lb)
+            upper.append(inf if ub is None else ub)
+            for v, coefficient in constraint.items():
+                index.append(self.columns[v.name])
+                values.append(coefficient)
+            start.append(len(index))
+        lp.num_row_ = len(lower)
+        lp.row_lower_ = np.array(lower, dtype=float)
+        lp.row_upper_ = np.array(upper, dtype=float)
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+        lp.a_matrix_.start_ = np.array(start, dtype=np.int32)
+        lp.a_matrix_.index_ = np.array(index, dtype=np.int32)
+        lp.a_matrix_.value_ = np.array(values, dtype=float)
+        self.highs.passModel(lp)
+        self._lp = lp
+        self._rows = dict(self.rows)
+        logger.info(
+            "HiGHS model built with {} variables and {} constraints".format(
+                lp.num_col_, lp.num_row_
+            )
+        )
+
+    def add_limit(self, name, variables, limit):
+        indices = np.array([self.columns[v.name] for v in variables], dtype=np.int32)
+        self.rows[name] = self.highs.getNumRow()
+        self.highs.addRow(
+            -highspy.kHighsInf,
+            limit,
+            len(indices),
+            indices,
+            np.ones(len(indices)),
+        )
+
+    def set_limit(self, name, limit):
+        self.highs.changeRowBounds(self.rows[name], -highspy.kHighsInf, limit)
+
+    def relax(self, name):
+        inf = highspy.kHighsInf
+        self.highs.changeRowBounds(self.rows[name], -inf, inf)
+
+    def fix(self, variable, value=1):
+        super().fix(variable, value)
+        self.highs.changeColBounds(self.columns[variable.name], value, value)
+
+    def set_objective(self, coefficients):
+        super().set_objective(coefficients)
+        indices = np.array([self.columns[v.name] for v in coefficients], dtype=np.int32)
+        costs = np.array(list(coefficients.values()), dtype=float)
+        self.highs.changeColsCost(len(indices), indices, costs)
+
+    def reset(self):
+        super().reset()
+        n_rows = self.highs.getNumRow()
+        if n_rows > self._lp.num_row_:
+            added = np.arange(self._lp.num_row_, n_rows, dtype=np.int32)
+            self.highs.deleteRows(len(added), added)
+        self.rows = dict(self._rows)
+        rows = np.arange(self._lp.num_row_, dtype=np.int32)
+        self.highs.changeRowsBounds(
+            len(rows), rows, self._lp.row_lower_, self._lp.row_upper_
+        )
+        columns = np.arange(self._lp.num_col_, dtype=np.int32)
+        self.highs.changeColsBounds(
+            len(columns), columns, self._lp.col_lower_, self._lp.col_upper_
+        )
+        self._solution = None
+
+    def solve(self):
+        with span("solve", solver="highs") as attributes:
+            if self._solution is not None:
+                self.highs.setSolution(self._solution)
+            startTime = perf_counter()
+            self.highs.run()
+            attributes["solver_seconds"] = perf_counter() - startTime
+            self.solves += 1
+            count("solves")
+            # Optimal, or feasible when stopped at the time limit
+            status = self.highs.getModelStatus()
+            assert status == highspy.HighsModelStatus.kOptimal or (
+                status == highspy.HighsModelStatus.kTimeLimit
+                and self.highs.getInfo().primal_solution_status
+                == highspy.SolutionStatus.kSolutionStatusFeasible
+            )
+            self._solution = self.highs.getSolution()
+            for v, x in zip(self.variables, self._solution.col_value):
+                v.varValue = round(x) if v.cat == LpInteger else x
+
+
+# Solver backends by name
+SOLVERS = dict(cbc=SolverSession, highs=HighsSession)
+
+
+def new_session(prob, solver="cbc", **options):
+    """Solver session for a problem, falling back to CBC if HiGHS is not installed
+
+    :param solver: name of a solver backend in `SOLVERS`
+    :param options: time_limit, gap and threads, see `SolverSession`
+    """
+    if solver not in SOLVERS:
+        raise ValueError(
+            "Unknown solver {}, expected one of {}".format(solver, list(SOLVERS))
+        )
+    if solver == "highs" and highspy is None:
+        logger.warning("highspy is not installed, solving with CBC instead")
+        solver = "cbc"
+    return SOLVERS[solver](prob, **options)
@@ -1,41 +1,219 @@
+import csv
 import re
 from datetime import datetime
-from os import listdir, makedirs
+from os import SEEK_END, listdir, makedirs
 from os.path import exists, getctime, isfile, join, split
 
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 
+FOLDER = "data"
+MANIFEST = "manifest.csv"
+MANIFEST_COLUMNS = ["league", "week", "timestamp", "path"]
+# Compact column types of scraped data, besides float32 weekly projections
+DTYPES = {
+    "ID": "int32",
+    "Team": "category",
+    "Position": "category",
+    "Owner": "category",
+    "Owner ID": "Int32",
+    "Status": "category",
+    "% Owned": "float32",
+    "Remaining": "float32",
+    "VOR": "float32",
+}
+# Number of best available players per position that set its replacement level
+REPLACEMENT_DEPTH = 3
 
-def save(df, week):
-    """Save scraped data"""
+
+def compact(df):
+    """Convert scraped data to compact column types
+
+    Teams, positions, owners and statuses are categorical, IDs are int32, Owner ID
+    is a nullable integer, and % Owned, weekly projections, Remaining and VOR are
+    float32. Values are rounded to 2 decimals by `scrape()`, so float32 keeps them.
+    """
+    df = df.copy()
+    if "% Owned" in df and not pd.api.types.is_numeric_dtype(df["% Owned"]):
+        df["% Owned"] = pd.to_numeric(
+            df["% Owned"].astype("string").str.rstrip("%"), errors="coerce"
+        )
+    if "Updated" in df:
+        df["Updated"] = pd.to_datetime(df["Updated"])
+    dtypes = {column: dtype for column, dtype in DTYPES.items() if column in df}
+    dtypes.update(
+        {column: np.float32 for column in df.columns if column.startswith("Week ")}
+    )
+    return df.astype(dtypes)
+
+
+def vor(df, week, depth=REPLACEMENT_DEPTH):
+    """Calculate value over replacement (VOR) of the remaining season
+
+    A position's replacement level is the mean remaining points of its `depth` best
+    available players. Multi-position players are compared against their highest
+    replacement level, and a position without available players of its own takes
+    the replacement level of the first multi-position group that includes it.
+
+    :param df: scraped data, e.g. from `load()`
+    :param week: first week of the remaining season
+    :param depth: (int) number of available players that set a replacement level
+    :return: df with Remaining and VOR columns, sorted by VOR
+    """
+
+    df = df.copy()
+    columns = ["Week {}".format(i) for i in range(week, 18)]
+    df["Remaining"] = df[columns].sum(axis=1)
+
+    # Replacement level of each position string, e.g. "WR, TE"
+    available = df.loc[df["Owner ID"].isnull(), ["Position", "Remaining"]]
+    available = available.astype({"Position": str})
+    means = (
+        available.sort_values("Remaining", ascending=False, kind="stable")
+        .groupby("Position")
+        .head(depth)
+        .groupby("Position")["Remaining"]
+        .mean()
+    )
+
+    # Single positions only available in multi-position groups
+    groups = means.index.to_series().str.split(",").explode().str.strip()
+    fallback = means[groups.index].set_axis(groups.to_numpy())
+    fallback = fallback[
+        ~fallback.index.duplicated() & ~fallback.index.isin(means.index)
+    ]
+    means = pd.concat([means, fallback])
+
+    # Highest replacement level of each player's positions
+    positions = pd.Series(df["Position"].astype(str).to_numpy()).str.split(",")
+    positions = positions.explode().str.strip()
+    replacement = positions.map(means).groupby(level=0).max()
+    df["VOR"] = df["Remaining"] - replacement.to_numpy()
+    return df.sort_values(by="VOR", ascending=False)
+
+
+def save(df, week, league=None):
+    """Save scraped data
+
+    Data is saved as a Parquet snapshot, and indexed in the data folder's manifest.
+
+    :param league: league ID, to load the latest snapshot of a league later
+    :return: filepath of the snapshot
+    """
 
     # Create data folder, if it doesn't exist
-    folder = "data"
+    folder = FOLDER
     if not exists(folder):
         makedirs(folder)
 
     # Create filename
     startTime = datetime.now()
-    filename = join(folder, "{:%Y-%m-%d %H%M} week {}.csv".format(startTime, week))
+    filename = "{:%Y-%m-%d %H%M} week {}.parquet".format(startTime, week)
+    if league is not None:
+        filename = "league {} {}".format(league, filename)
+    filepath = join(folder, filename)
 
     # Save data
-    df.to_csv(filename, index=False)
+    df.to_parquet(filepath, index=False)
+
+    # Index snapshot
+    manifest = join(folder, MANIFEST)
+    is_new = not exists(manifest)
+    with open(manifest, "a", newline="") as f:
+        writer = csv.writer(f)
+        if is_new:
+            writer.writerow(MANIFEST_COLUMNS)
+        writer.writerow(
+            ["" if league is None else league, week, startTime.isoformat(), filename]
+        )
+    return filepath
+
+
+def _latest(folder, league=None):
+    """Latest manifest entry of a league (or any league), or None"""
+    manifest = join(folder, MANIFEST)
+    if not exists(manifest):
+        return None
+    if league is None:
+        # Only read the end of the manifest
+        with open(manifest, "rb") as f:
+            f.seek(0, SEEK_END)
+            f.seek(max(f.tell() - 4096, 0))
+            lines = f.read().decode().splitlines()
+        rows = [] if len(lines) < 2 else [next(csv.reader(lines[-1:]))]
+    else:
+        with open(manifest, newline="") as f:
+            rows = [
+                row
+                for row in csv.reader(f)
+                if row and row[0] == str(league) and row != MANIFEST_COLUMNS
+            ]
+    if not rows or rows[-1] == MANIFEST_COLUMNS:
+        return None
+    return dict(zip(MANIFEST_COLUMNS, rows[-1]))
+
 
+def load(filepath=None, league=None, columns=None, weeks=None):
+    """Load latest scraped data
 
-def load(filepath=None):
-    """Load latest scraped data"""
+    :param filepath: snapshot to load, defaults to the latest snapshot
+    :param league: league ID of the latest snapshot to load
+    :raises FileNotFoundError: if there is no snapshot (of the league)
+    :param columns: (list) only load these columns
+    :param weeks: (list) only load projections of these weeks, e.g. range(4, 18)
+    :return: (df, week)
+    """
 
+    week = None
     if not filepath:
-        # Find latest csv file
-        folder = join(".", "data")
-        files = [f for f in listdir(folder) if isfile(join(folder, f))]
-        filepath = max([join(folder, f) for f in files], key=getctime)
-    filename = split(filepath)[1]
+        entry = _latest(FOLDER, league)
+        if entry:
+            filepath = join(FOLDER, entry["path"])
+            week = int(entry["week"])
+        elif league is not None:
+            raise FileNotFoundError(
+                "No snapshot of league {} in {}".format(league, FOLDER)
+            )
+        else:
+            # Find latest file, saved before the manifest
+            folder = join(".", FOLDER)
+            files = [
+                join(folder, f)
+                for f in listdir(folder)
+                if isfile(join(folder, f))
+                and f.endswith((".csv", ".parquet"))
+                and f != MANIFEST
+            ]
+            if not files:
+                raise FileNotFoundError("No snapshot in {}".format(FOLDER))
+            filepath = max(files, key=getctime)
 
     # Unpack data
-    week = re.findall(r"\d+", filename)[-1]
-    week = int(week)
-    df = pd.read_csv(filepath)
+    if week is None:
+        week = re.findall(r"\d+", split(filepath)[1])[-1]
+        week = int(week)
+    if filepath.endswith(".parquet"):
+        names = pq.read_schema(filepath).names
+    else:
+        names = pd.read_csv(filepath, nrows=0).columns.tolist()
+    if columns is None and weeks is None:
+        usecols = None
+    else:
+        usecols = [
+            name
+            for name in names
+            if (columns is None or name in columns)
+            and (
+                weeks is None
+                or not name.startswith("Week ")
+                or int(name.split()[1]) in weeks
+            )
+        ]
+    if filepath.endswith(".parquet"):
+        df = pq.read_table(filepath, columns=usecols, memory_map=True).to_pandas()
+    else:
+        df = pd.read_csv(filepath, usecols=usecols)
 
     # Return results
     return df, week
@@ -37,10 +37,14 @@ setup(
         "Programming Language :: Python :: 3",
     ],
     keywords="fantasy-football bot yahoo",
-    packages=find_packages(exclude=["contrib", "docs", "tests"]),
+    packages=find_packages(exclude=["benchmarks", "contrib", "docs", "tests"]),
     python_requires=">=3.0",
     install_requires=get_requirements(),
-    extra_require={
+    entry_points={
+        "console_scripts": ["ffbot=ffbot.cli:main"],
+    },
+    extras_require={
+        "highs": get_requirements("highs"),
         "test": get_requirements("test"),
     },
 )
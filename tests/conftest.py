@@ -0,0 +1,21 @@
+import pytest
+
+from benchmarks.mock_yahoo import MockYahoo
+from ffbot import scraper
+
+
+@pytest.fixture
+def mock_yahoo(monkeypatch):
+    """Start a MockYahoo server and point the scraper at it, e.g.
+    `yahoo = mock_yahoo(n_players=30)`. Servers are stopped after the test."""
+    servers = []
+
+    def start(**options):
+        yahoo = MockYahoo(**options).__enter__()
+        servers.append(yahoo)
+        monkeypatch.setattr(scraper, "BASE_URL", yahoo.url)
+        return yahoo
+
+    yield start
+    for yahoo in servers:
+        yahoo.__exit__(None, None, None)
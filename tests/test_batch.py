@@ -0,0 +1,27 @@
+from pandas.testing import assert_frame_equal
+
+import ffbot
+
+from . import POSITIONS, SCRAPER_FILE, TEAM
+
+
+def test_optimize_batch():
+    df, week = ffbot.load(SCRAPER_FILE)
+    jobs = {
+        "team": (df, week, TEAM, POSITIONS),
+        "other team": (df, week, 3, POSITIONS),
+        "bad league": (df.drop(columns="VOR"), week, TEAM, POSITIONS),
+    }
+    results = ffbot.optimize_batch(jobs, max_workers=2, pruning=True)
+    assert list(results) == list(jobs)
+    assert results["team"].error is None
+    assert results["other team"].error is None
+    assert "VOR" in results["bad league"].error
+    df_opt = ffbot.optimize(df, week, TEAM, POSITIONS, pruning=True)
+    assert_frame_equal(results["team"].df_opt, df_opt)
+
+    # Jobs optimize up to the end week
+    results = ffbot.optimize_batch(jobs, max_workers=2, pruning=True, end_week=10)
+    assert results["team"].error is None
+    df_opt = ffbot.optimize(df, week, TEAM, POSITIONS, pruning=True, end_week=10)
+    assert_frame_equal(results["team"].df_opt, df_opt)
@@ -0,0 +1,84 @@
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import ffbot
+from ffbot.scraper import create_session
+
+
+class Handler(BaseHTTPRequestHandler):
+    requests = 0
+
+    def do_GET(self):
+        Handler.requests += 1
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = "page {}".format(self.path).encode()
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{}".format(httpd.server_port)
+    httpd.shutdown()
+
+
+def test_cache(server, tmp_path):
+    Handler.requests = 0
+    cache = ffbot.ResponseCache(
+        tmp_path, ttls={"playernote": timedelta(hours=1)}, default_ttl=timedelta(0)
+    )
+    s = create_session(cache=cache)
+
+    # Fresh responses are served from cache, regardless of params order
+    r = s.get(server + "/f1/1/playernote", params=dict(pid=1, a=2))
+    assert r.text == "page /f1/1/playernote?pid=1&a=2"
+    r = s.get(server + "/f1/1/playernote", params=dict(a=2, pid=1))
+    assert r.text == "page /f1/1/playernote?pid=1&a=2"
+    assert Handler.requests == 1
+    assert cache.hits == 1
+
+    # Stale responses are revalidated
+    r = s.get(server + "/f1/1/players")
+    r = s.get(server + "/f1/1/players")
+    assert r.status_code == 200
+    assert r.text == "page /f1/1/players"
+    assert Handler.requests == 3
+    assert cache.revalidated == 1
+
+    # Offline replay
+    s = create_session(cache=ffbot.ResponseCache(tmp_path, offline=True))
+    r = s.get(server + "/f1/1/players")
+    assert r.text == "page /f1/1/players"
+    with pytest.raises(requests.ConnectionError):
+        s.get(server + "/f1/1/other")
+    assert Handler.requests == 3
+
+
+def test_cache_overwrite(server, tmp_path):
+    cache = ffbot.ResponseCache(tmp_path, default_ttl=timedelta(0))
+    s = create_session(cache=cache)
+    for _ in range(3):
+        r = s.get(server + "/f1/1/players")
+        cache.put(r.url, r)
+    assert cache._size == sum(f.stat().st_size for f in tmp_path.iterdir())
+
+    # Responses evicted by another thread are cache misses
+    cache.max_size = 0
+    cache.evict()
+    assert cache.get(server + "/f1/1/players") is None
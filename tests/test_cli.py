@@ -0,0 +1,35 @@
+import subprocess
+import sys
+
+from ffbot.cli import main
+
+from . import SCRAPER_FILE, TEAM
+
+
+def test_lazy_import():
+    code = (
+        "import sys, ffbot; ffbot.current_week; "
+        "print(sorted({'numpy', 'pandas', 'pulp', 'tqdm'} & set(sys.modules)))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "[]"
+
+
+def test_cli(monkeypatch, tmp_path, capsys, mock_yahoo):
+    main(["load", "--file", SCRAPER_FILE, "--rows", "3"])
+    assert capsys.readouterr().out.startswith("Week 4, 391 players")
+
+    main(["optimize", str(TEAM), "--file", SCRAPER_FILE, "--pruning"])
+    assert "Player 129 (QB) - Free Agent" in capsys.readouterr().out
+
+    monkeypatch.chdir(tmp_path)
+    mock_yahoo(n_players=20)
+    main(["scrape", "1", "--rate", "0"])
+    assert "Saved 20 players of week 4" in capsys.readouterr().out
+    main(["load", "--league", "1"])
+    assert capsys.readouterr().out.startswith("Week 4, 20 players")
+
+    main(["discover", "--start", "100", "--stop", "300", "--rate", "0"])
+    assert capsys.readouterr().out == "DEF: 101\nIDP: 283\n"
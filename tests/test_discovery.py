@@ -0,0 +1,38 @@
+import json
+
+from ffbot import discovery, scraper
+
+
+def test_find_public_leagues(tmp_path, mock_yahoo):
+    filepath = str(tmp_path / "public-leagues.json")
+    public_leagues = {7: "DEF", 12: "IDP", 30: "DEF"}
+    yahoo = mock_yahoo(n_players=20, public_leagues=public_leagues)
+    found = discovery.find_public_leagues(
+        range(100), max_workers=4, rate=None, filepath=filepath
+    )
+    assert found == dict(DEF=7, IDP=12)
+
+    # Stops once both kinds are found
+    assert yahoo.requests["settings"] < 30
+    with open(filepath) as f:
+        probes = json.load(f)
+    assert probes["public"] == dict(DEF=7, IDP=12)
+    assert set(range(7)) <= set(map(int, probes["invalid"]))
+
+    # Known public leagues are validated first, and others aren't probed again
+    yahoo.requests.clear()
+    found = discovery.find_public_leagues(
+        range(100), ["DEF"], max_workers=1, rate=None, filepath=filepath
+    )
+    assert found == dict(DEF=7)
+    assert yahoo.requests["settings"] == 1
+
+
+def test_scraper_fail_over(monkeypatch, tmp_path, mock_yahoo):
+    monkeypatch.setattr(discovery, "DISCOVERY_RATE", None)
+    monkeypatch.setattr(discovery, "PROBES_FILE", str(tmp_path / "probes.json"))
+    monkeypatch.setattr(scraper, "PUBLIC_LEAGUE", 101)
+    mock_yahoo(n_players=20, public_leagues={5: "DEF"})
+    df = scraper.scrape(1, rate=None)
+    assert scraper.PUBLIC_LEAGUE == 5
+    assert len(df) == 20
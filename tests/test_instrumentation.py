@@ -0,0 +1,44 @@
+import json
+
+import ffbot
+
+from . import POSITIONS, SCRAPER_FILE, TEAM
+
+
+def test_trace_scrape(tmp_path, mock_yahoo):
+    yahoo = mock_yahoo(n_players=50)
+    with ffbot.trace() as tracer:
+        ffbot.scrape(1, rate=None)
+    summary = tracer.summary()
+    assert tracer.counters["requests"] == sum(yahoo.requests.values())
+    assert summary["http"]["count"] == sum(yahoo.requests.values())
+    assert summary["parse"]["count"] == sum(yahoo.requests.values()) - 1
+    assert summary["scrape"]["seconds"] <= tracer.seconds
+    for name in ["player ids", "projections", "dataframe", "vor"]:
+        assert summary[name]["count"] == 1
+
+    tracer.save(tmp_path / "trace.json")
+    with open(tmp_path / "trace.json") as f:
+        assert json.load(f)["counters"]["requests"] == tracer.counters["requests"]
+    tracer.save(tmp_path / "chrome.json", format="chrome")
+    with open(tmp_path / "chrome.json") as f:
+        events = json.load(f)["traceEvents"]
+    assert len(events) == len(tracer.spans) + 1
+
+
+def test_trace_optimize():
+    df, week = ffbot.load(SCRAPER_FILE)
+    with ffbot.trace(profile=True) as tracer:
+        ffbot.optimize(df, week, TEAM, POSITIONS, pruning=True)
+    solves = [span for span in tracer.to_dict()["spans"] if span["name"] == "solve"]
+    assert len(solves) == tracer.counters["solves"] > 0
+    assert all(0 < span["solver_seconds"] <= span["seconds"] for span in solves)
+    assert tracer.counters["variables"] > 0
+    assert tracer.counters["constraints"] > 0
+    assert tracer.profile.total_calls > 0
+
+    # Nothing is recorded outside of tracing
+    n_spans = len(tracer.spans)
+    ffbot.optimize(df, week, TEAM, POSITIONS, pruning=True)
+    assert len(tracer.spans) == n_spans
+    assert tracer.counters["solves"] == len(solves)
@@ -1,6 +1,10 @@
 import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
 
 import ffbot
+from benchmarks.synthetic import SLOTS, synthetic_players
+from ffbot import solver
 
 from . import POSITIONS, SCRAPER_FILE, TEAM
 
@@ -21,3 +25,98 @@ def test_optimize():
 8                                     Player 132 (WR)          0.0               0.0    0.0
 9      Player 129 (QB) - Free Agent   Player 174 (WR)        14.53              0.85  11.16"""  # noqa: W291
     assert df_opt.to_string() == desired_df_opt
+
+
+def test_optimize_highs():
+    pytest.importorskip("highspy")
+    df, week = ffbot.load(SCRAPER_FILE)
+    df_opt = ffbot.optimize(df, week, TEAM, POSITIONS)
+    df_opt_highs = ffbot.optimize(df, week, TEAM, POSITIONS, solver="highs")
+    assert_frame_equal(df_opt_highs, df_opt)
+
+
+def _scoring_moves(df_opt):
+    """Points of each recommendation that changes discounted points"""
+    points = df_opt[["Total points", "Discounted points"]]
+    return points[~points["Discounted points"].isin(["", 0])].reset_index(drop=True)
+
+
+@pytest.mark.parametrize("slots", list(SLOTS))
+def test_optimize_solvers_agree(slots):
+    # Solvers may pick different players among moves worth exactly the same
+    pytest.importorskip("highspy")
+    df = synthetic_players(250, slots, week=4, multi_share=0.05)
+    df_opt = ffbot.optimize(df, 4, 1, SLOTS[slots], pruning=True)
+    df_opt_highs = ffbot.optimize(df, 4, 1, SLOTS[slots], pruning=True, solver="highs")
+    assert_frame_equal(_scoring_moves(df_opt_highs), _scoring_moves(df_opt))
+
+
+def test_optimize_highs_fallback(monkeypatch):
+    monkeypatch.setattr(solver, "highspy", None)
+    df, week = ffbot.load(SCRAPER_FILE)
+    df_opt = ffbot.optimize(df, week, TEAM, POSITIONS, pruning=True)
+    df_opt_fallback = ffbot.optimize(
+        df,
+        week,
+        TEAM,
+        POSITIONS,
+        pruning=True,
+        solver="highs",
+        time_limit=60,
+        threads=1,
+    )
+    assert_frame_equal(df_opt_fallback, df_opt)
+
+
+def test_optimize_bounded():
+    df, week = ffbot.load(SCRAPER_FILE)
+    df_opt = ffbot.optimize(df, week, TEAM, POSITIONS, pruning=True)
+    df_opt_bounded = ffbot.optimize(
+        df, week, TEAM, POSITIONS, pruning=True, ranking="bounded"
+    )
+    assert_frame_equal(df_opt_bounded, df_opt)
+    assert df_opt_bounded.attrs["solves"] < df_opt.attrs["solves"]
+
+
+def test_optimize_bounded_synthetic():
+    # Both rankings make the same moves, and bounded ranking usually solves less
+    solves = dict(stepwise=0, bounded=0)
+    for slots in SLOTS:
+        for seed in range(2):
+            df = synthetic_players(400, slots, week=4, seed=seed)
+            df_opt = ffbot.optimize(df, 4, 1, SLOTS[slots], pruning=True)
+            df_opt_bounded = ffbot.optimize(
+                df, 4, 1, SLOTS[slots], pruning=True, ranking="bounded"
+            )
+            assert_frame_equal(df_opt_bounded, df_opt)
+            solves["stepwise"] += df_opt.attrs["solves"]
+            solves["bounded"] += df_opt_bounded.attrs["solves"]
+    assert solves["bounded"] < solves["stepwise"]
+
+
+def test_optimize_reference():
+    df, week = ffbot.load(SCRAPER_FILE)
+    df_opt = ffbot.optimize(df, week, TEAM, POSITIONS)
+    df_opt_reference = ffbot.optimize(
+        df, week, TEAM, POSITIONS, formulation="reference"
+    )
+    assert_frame_equal(df_opt, df_opt_reference)
+
+
+def test_prune():
+    df, week = ffbot.load(SCRAPER_FILE)
+    df_pruned = ffbot.prune(df, week, TEAM, POSITIONS)
+    assert len(df_pruned) < len(df)
+    assert set(df.loc[df["Owner ID"] == TEAM, "ID"]) <= set(df_pruned["ID"])
+    df_opt = ffbot.optimize(df, week, TEAM, POSITIONS)
+    df_opt_pruned = ffbot.optimize(df, week, TEAM, POSITIONS, pruning=True)
+    assert_frame_equal(df_opt_pruned, df_opt)
+
+
+def test_optimize_compact():
+    df, week = ffbot.load(SCRAPER_FILE)
+    df_opt = ffbot.optimize(df, week, TEAM, POSITIONS, pruning=True)
+    df_opt_compact = ffbot.optimize(
+        ffbot.compact(df), week, TEAM, POSITIONS, pruning=True
+    )
+    assert_frame_equal(df_opt_compact, df_opt)
@@ -0,0 +1,53 @@
+import numpy as np
+from pandas.testing import assert_frame_equal
+
+import ffbot
+
+from . import POSITIONS, SCRAPER_FILE, TEAM
+
+
+def test_sweep():
+    df, week = ffbot.load(SCRAPER_FILE)
+    # One worker re-solves the same model for each interest rate
+    df_sweep = ffbot.sweep(
+        df, week, TEAM, POSITIONS, [0.4, 0.2], [10], max_workers=1, pruning=True
+    )
+    assert set(df_sweep["Interest rate"]) == {0.4, 0.2}
+    assert set(df_sweep["End week"]) == {10}
+    for interest_rate in [0.4, 0.2]:
+        df_opt = ffbot.optimize(
+            df,
+            week,
+            TEAM,
+            POSITIONS,
+            pruning=True,
+            interest_rate=interest_rate,
+            end_week=10,
+        )
+        scenario = df_sweep[df_sweep["Interest rate"] == interest_rate]
+        scenario = scenario.drop(columns=["Interest rate", "End week"])
+        assert_frame_equal(scenario.reset_index(drop=True), df_opt)
+
+
+def test_simulate():
+    df, week = ffbot.load(SCRAPER_FILE)
+    # Without noise, every sample has the same optimal moves
+    df_moves = ffbot.simulate(
+        df, week, TEAM, POSITIONS, n_samples=2, noise=0.0, max_workers=1
+    )
+    assert (df_moves["Probability"] == 1).all()
+    moved = df.set_index("ID").loc[df_moves["ID"]]
+    assert moved["Owner ID"].isna().tolist() == (df_moves["Move"] == "Add").tolist()
+    df_moves2 = ffbot.simulate(
+        df,
+        week,
+        TEAM,
+        POSITIONS,
+        n_samples=2,
+        noise=lambda rng, projections, n: np.repeat(projections[None], n, axis=0),
+        max_workers=1,
+    )
+    assert_frame_equal(df_moves2, df_moves)
+
+    df_opt = ffbot.simulate(df, week, TEAM, POSITIONS, noise=0.0, method="average")
+    assert_frame_equal(df_opt, ffbot.optimize(df, week, TEAM, POSITIONS))
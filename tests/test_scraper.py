@@ -0,0 +1,186 @@
+import json
+from datetime import timedelta
+from os.path import join
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ffbot
+from ffbot import scraper
+from ffbot.scraper import parse_playernote
+
+PLAYERNOTE_FILE = join("tests", "playernote.html")
+
+
+def test_parse_playernote():
+    with open(PLAYERNOTE_FILE) as f:
+        html = f.read()
+    row = parse_playernote(html)
+    assert row["Name"] == "Patrick Mahomes"
+    assert row["Position"] == "QB"
+    assert row["Owner"] == "Air Raid"
+    assert row["Owner ID"] == 5
+    assert row["Status"] == "Q"
+    assert row["% Owned"] == "99%"
+    assert row["Week 1"] == 28.52  # game completed
+    assert row["Week 4"] == 22.41  # game hasn't occured yet
+    assert row["Week 10"] == 0  # bye week
+    assert len([column for column in row if column.startswith("Week ")]) == 18
+
+    # Free agent without injury status
+    html = html.replace('<span class="status F-injury Fz-xxs">Q</span>', "")
+    html = html.replace(
+        '<a href="https://football.fantasysports.yahoo.com/f1/123456/5">Air Raid</a>,',
+        "Free Agent,",
+    )
+    row = parse_playernote(html)
+    assert row["Owner"] == "Free Agent"
+    assert np.isnan(row["Owner ID"])
+    assert np.isnan(row["Status"])
+
+
+def test_scrape(mock_yahoo):
+    yahoo = mock_yahoo(n_players=100)
+    df = ffbot.scrape(1, max_workers=4, rate=None)
+    assert yahoo.requests["playernote"] == 100
+    expected = yahoo.df.set_index("ID")
+    df = df.set_index("ID").loc[expected.index]
+    assert (df["Position"].astype(str) == expected["Position"]).all()
+    assert df["Owner ID"].astype(float).equals(expected["Owner ID"])
+    for column in ["Week 1", "Week 17", "Remaining", "VOR"]:
+        assert (df[column] - expected[column]).abs().max() < 0.01
+
+
+def test_scrape_previous(mock_yahoo):
+    yahoo = mock_yahoo(n_players=40)
+    previous = ffbot.scrape(1, rate=None)
+    new, moved, expired = previous["ID"][:3]
+    previous = previous[previous["ID"] != new].astype(dict(Team=object))
+    previous.loc[previous["ID"] == moved, "Team"] = "XX"
+    previous.loc[previous["ID"] == expired, "Updated"] = pd.Timestamp(2000, 1, 1)
+    with pytest.raises(ValueError):
+        ffbot.scrape(1, rate=None, previous=previous)
+
+    # Only new, moved and expired players are scraped again
+    requests = yahoo.requests["playernote"]
+    df = ffbot.scrape(1, rate=None, previous=previous, ttl=timedelta(hours=1))
+    assert yahoo.requests["playernote"] == requests + 3
+    assert sorted(df["ID"]) == sorted(yahoo.df["ID"])
+    df = df.set_index("ID")
+    previous = previous.set_index("ID")
+    expected = yahoo.df.set_index("ID")
+    assert df.loc[moved, "Team"] == expected.loc[moved, "Team"]
+    assert df.loc[expired, "Updated"] > pd.Timestamp(2000, 1, 1)
+    reused = previous.index.difference([moved, expired])
+    assert (df.loc[reused, "Updated"] == previous.loc[reused, "Updated"]).all()
+    for column in ["Week 17", "Remaining", "VOR"]:
+        assert (df[column] - expected.loc[df.index, column]).abs().max() < 0.01
+
+
+def test_retries_rate_limited(mock_yahoo):
+    class CountingLimiter(scraper.RateLimiter):
+        waits = 0
+
+        def wait(self, host):
+            CountingLimiter.waits += 1
+
+    limiter = CountingLimiter()
+    yahoo = mock_yahoo(n_players=30, error_rate=0.3, error_codes=[503])
+    s = scraper.create_session(limiter)
+    for ID in yahoo.df["ID"]:
+        s.get(yahoo.url + "/1/playernote", params=dict(pid=ID))
+    assert yahoo.errors > 0
+    assert limiter.waits == sum(yahoo.requests.values())
+
+
+def test_league_context(monkeypatch, tmp_path, mock_yahoo):
+    yahoo = mock_yahoo(n_players=30)
+    monkeypatch.setattr(scraper, "_contexts", dict())
+    context = ffbot.league_context(folder=tmp_path)
+    assert context.week == yahoo.week
+    assert sorted(ID for ID, _ in context.players) == sorted(yahoo.df["ID"])
+    requests = sum(yahoo.requests.values())
+
+    # Leagues share the context of this process, and of other processes on disk
+    ffbot.scrape(1, rate=None)
+    ffbot.scrape(2, rate=None)
+    monkeypatch.setattr(scraper, "_contexts", dict())
+    assert ffbot.league_context(folder=tmp_path) == context
+    assert sum(yahoo.requests.values()) == requests + 2 * len(yahoo.df)
+
+    # Stale contexts are discovered again
+    ffbot.league_context(ttl=timedelta(0), folder=tmp_path)
+    assert sum(yahoo.requests.values()) == 2 * requests + 2 * len(yahoo.df)
+
+
+def test_scrape_checkpoint(tmp_path, mock_yahoo):
+    checkpoint = tmp_path / "checkpoint.jsonl"
+    yahoo = mock_yahoo(n_players=40)
+    notes = dict(yahoo._notes)
+    broken = list(yahoo.df["ID"][:3])
+    for ID in broken:
+        yahoo._notes[ID] = json.dumps(dict(content="<html></html>")).encode()
+    df = ffbot.scrape(1, rate=None, checkpoint=checkpoint)
+    assert sorted(df.attrs["quarantined"]) == sorted(broken)
+    assert set(df["ID"]) == set(yahoo.df["ID"]) - set(broken)
+    assert checkpoint.exists()
+
+    # Resuming only scrapes the quarantined players
+    yahoo._notes.update(notes)
+    requests = yahoo.requests["playernote"]
+    df = ffbot.scrape(1, rate=None, checkpoint=checkpoint)
+    assert yahoo.requests["playernote"] == requests + len(broken)
+    assert df.attrs["quarantined"] == dict()
+    assert set(df["ID"]) == set(yahoo.df["ID"])
+    assert not checkpoint.exists()
+
+
+def test_scrape_checkpoint_stale(tmp_path, mock_yahoo):
+    checkpoint = tmp_path / "checkpoint.jsonl"
+    yahoo = mock_yahoo(n_players=20)
+    broken = yahoo.df["ID"][0]
+    yahoo._notes[broken] = json.dumps(dict(content="<html></html>")).encode()
+    ffbot.scrape(1, rate=None, checkpoint=checkpoint)
+    assert checkpoint.exists()
+
+    # Checkpoints started longer ago than their time-to-live aren't resumed
+    with open(checkpoint) as f:
+        lines = f.readlines()
+    header = json.loads(lines[0])
+    header["started"] = "2000-01-01T00:00:00"
+    with open(checkpoint, "w") as f:
+        f.writelines([json.dumps(header) + "\n"] + lines[1:])
+    requests = yahoo.requests["playernote"]
+    ffbot.scrape(1, rate=None, checkpoint=checkpoint)
+    assert yahoo.requests["playernote"] == requests + 20
+
+    # Neither are checkpoints of another week
+    yahoo = mock_yahoo(n_players=20, week=5, seed=1)
+    df = ffbot.scrape(1, rate=None, checkpoint=checkpoint)
+    assert yahoo.requests["playernote"] == 20
+    expected = yahoo.df.set_index("ID")
+    df = df.set_index("ID").loc[expected.index]
+    assert (df["Week 5"] - expected["Week 5"]).abs().max() < 0.01
+
+
+def test_scrape_checkpoint_previous(tmp_path, mock_yahoo):
+    checkpoint = tmp_path / "checkpoint.jsonl"
+    yahoo = mock_yahoo(n_players=20)
+    previous = ffbot.scrape(1, rate=None)
+    broken = yahoo.df["ID"][0]
+    yahoo._notes[broken] = json.dumps(dict(content="<html></html>")).encode()
+    ffbot.scrape(1, rate=None, checkpoint=checkpoint)
+    assert checkpoint.exists()
+
+    # Players reused from the previous scrape aren't also resumed
+    df = ffbot.scrape(
+        1,
+        rate=None,
+        previous=previous,
+        ttl=timedelta(hours=1),
+        checkpoint=checkpoint,
+    )
+    assert sorted(df["ID"]) == sorted(yahoo.df["ID"])
+    vor = df.set_index("ID")["VOR"].sort_index()
+    assert vor.equals(previous.set_index("ID")["VOR"].sort_index())
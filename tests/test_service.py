@@ -0,0 +1,81 @@
+import json
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+import ffbot
+
+from . import POSITIONS, SCRAPER_FILE, TEAM
+
+
+def _post(url, data):
+    try:
+        with urlopen(url, json.dumps(data).encode()) as r:
+            return r.status, json.load(r)
+    except HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_service(mock_yahoo):
+    df, week = ffbot.load(SCRAPER_FILE)
+    service = ffbot.Service(refresh=None, snapshots=False)
+    service.add_league(1, df, week)
+    request = dict(league=1, team=TEAM, positions=POSITIONS, pruning=True)
+    with service:
+        status, result = _post(service.url + "/optimize", request)
+        assert status == 200
+        assert not result["cached"]
+        df_opt = ffbot.optimize(df, week, TEAM, POSITIONS, pruning=True)
+        assert result["moves"] == json.loads(
+            json.dumps(df_opt.to_dict("records"), default=str)
+        )
+
+        # Repeat requests are cached, and other interest rates re-solve the model
+        status, cached = _post(service.url + "/optimize", request)
+        assert cached["cached"] and cached["moves"] == result["moves"]
+        assert cached["seconds"] < result["seconds"]
+        status, result = _post(
+            service.url + "/optimize", dict(request, interest_rate=0.2)
+        )
+        df_opt = ffbot.optimize(
+            df, week, TEAM, POSITIONS, pruning=True, interest_rate=0.2
+        )
+        assert result["moves"] == json.loads(
+            json.dumps(df_opt.to_dict("records"), default=str)
+        )
+        assert service.status()["models"] == 1
+
+        assert _post(service.url + "/optimize", dict(request, league=2))[0] == 404
+        assert _post(service.url + "/optimize", dict(request, color="red"))[0] == 400
+
+        # Refreshing a league scrapes it again, and forgets its results
+        yahoo = mock_yahoo(n_players=30)
+        status, league = _post(service.url + "/refresh", dict(league=1))
+        assert status == 200
+        assert league == dict(league, version=2, week=yahoo.week, players=30)
+        with urlopen(service.url + "/status") as r:
+            assert json.load(r)["results"] == 0
+
+
+def test_service_unknown_ranking():
+    df, week = ffbot.load(SCRAPER_FILE)
+    service = ffbot.Service(refresh=None, snapshots=False)
+    service.add_league(1, df, week)
+    with pytest.raises(ValueError):
+        service.optimize(1, TEAM, ranking="random")
+
+
+def test_service_snapshots(monkeypatch, tmp_path, mock_yahoo):
+    df, week = ffbot.load(SCRAPER_FILE)
+    monkeypatch.chdir(tmp_path)
+    ffbot.save(df, week, league=1)
+
+    # Leagues start from their own snapshot, and others are scraped
+    mock_yahoo(n_players=30)
+    service = ffbot.Service([1, 999], refresh=None, snapshots=True, rate=None)
+    leagues = service.status()["leagues"]
+    assert leagues[1]["players"] == len(df)
+    assert leagues[999]["players"] == 30
+    df_999, _ = ffbot.load(league=999)
+    assert len(df_999) == 30
@@ -1,4 +1,5 @@
 import pandas as pd
+import pytest
 from pandas.testing import assert_frame_equal
 
 import ffbot
@@ -12,3 +13,59 @@ def test_load():
     assert week == desired_week
     desired_df = pd.read_csv(SCRAPER_FILE)
     assert_frame_equal(df, desired_df)
+
+
+def test_save_load(tmp_path, monkeypatch):
+    df, week = ffbot.load(SCRAPER_FILE)
+    monkeypatch.chdir(tmp_path)
+    ffbot.save(df.head(10), week, league=1)
+    ffbot.save(df, week, league=2)
+    df2, week2 = ffbot.load()
+    assert week2 == week
+    assert_frame_equal(df2, df)
+    df2, _ = ffbot.load(league=1)
+    assert_frame_equal(df2, df.head(10))
+
+    # Load a subset of columns and weeks
+    df2, _ = ffbot.load(league=2, columns=["ID", "Name", "Week 5"], weeks=[4, 5])
+    assert list(df2.columns) == ["ID", "Name", "Week 5"]
+    df2, _ = ffbot.load(league=2, weeks=range(week, 18))
+    assert "Week 3" not in df2
+    assert_frame_equal(df2, df.drop(columns=["Week 1", "Week 2", "Week 3", "Week 18"]))
+
+
+def test_compact(tmp_path, monkeypatch):
+    df, week = ffbot.load(SCRAPER_FILE)
+    df = ffbot.compact(df)
+    assert df["ID"].dtype == "int32"
+    assert df["Position"].dtype == "category"
+    assert df["Owner ID"].dtype == "Int32"
+    assert df["% Owned"].iloc[0] == 100
+    assert (df.filter(like="Week ").dtypes == "float32").all()
+    monkeypatch.chdir(tmp_path)
+    ffbot.save(df, week)
+    df2, _ = ffbot.load()
+    assert_frame_equal(df2, df)
+
+
+def test_vor():
+    df, week = ffbot.load(SCRAPER_FILE)
+    df2 = ffbot.vor(df.drop(columns=["Remaining", "VOR"]), week)
+    assert (df2["VOR"].diff().dropna() <= 0).all()
+    df2 = df2.loc[df.index]
+    assert (df2["Remaining"] - df["Remaining"]).abs().max() < 0.01
+    assert (df2["VOR"] - df["VOR"]).abs().max() < 0.01
+
+    # A deeper replacement level lowers it, and so raises VOR
+    df3 = ffbot.vor(df, week, depth=10).loc[df.index]
+    assert (df3["VOR"] >= df2["VOR"]).all()
+
+
+def test_load_missing_league(tmp_path, monkeypatch):
+    df, week = ffbot.load(SCRAPER_FILE)
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(FileNotFoundError):
+        ffbot.load(league=999)
+    ffbot.save(df.head(10), week, league=1)
+    with pytest.raises(FileNotFoundError):
+        ffbot.load(league=999)